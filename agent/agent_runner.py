@@ -3,14 +3,22 @@
 Agent runner module that configures and executes the productivity agent.
 Handles the setup of the LLM, tools, and streaming of responses.
 """
-from typing import Iterator, Dict, Any, Optional
+from typing import AsyncIterator, Iterator, Dict, Any, Optional, Union
+from contextlib import aclosing
 from functools import lru_cache
+import asyncio
+import json
 import logging
-from datetime import datetime
+import queue
+import sys
+import threading
+import time
+import uuid
 
+import httpx
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage, BaseMessage
+from langchain_core.messages import AIMessageChunk, HumanMessage, BaseMessage
 from langchain_openai import AzureChatOpenAI
 
 from agent.config import (
@@ -18,73 +26,277 @@ from agent.config import (
     AZURE_OPENAI_ENDPOINT,
     AZURE_OPENAI_API_VERSION,
     AZURE_OPENAI_DEPLOYMENT_NAME,
+    TOOL_CACHE_TTL,
 )
-from agent.tools import TOOLS
+from agent.tools import TOOLS_ASYNC, configure_tool_cache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import tiktoken
+except ImportError:  # optional: without it only the character cap applies
+    tiktoken = None
+
+__all__ = ["AgentConfig", "check_query_size", "get_agent", "run_agent", "run_agent_sync"]
+
+# Logging is configured by the application entry point
 logger = logging.getLogger(__name__)
 
+# Per-request limits for Azure OpenAI calls. The read timeout sits a little
+# above typical completion latency; the client retries 429/5xx and timeouts
+# with exponential backoff and jitter.
+LLM_REQUEST_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
+LLM_MAX_RETRIES = 2
+
+# Azure OpenAI connection pool. httpx drops idle connections after 5 s by
+# default, which made almost every prompt pay a fresh TCP+TLS handshake.
+AZURE_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120)
+
+# Seconds run_agent_sync waits for a cancelled run to unwind
+RUN_CANCEL_GRACE = 5.0
+
+# Loop shared by all run_agent_sync callers; see _get_event_loop
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+# Conversation memory shared by every cached agent, keyed by thread_id
+_CHECKPOINTER = MemorySaver()
+
+# Checkpoint once when a run ends instead of after every super-step; only the
+# final state of a turn is ever read back
+CHECKPOINT_DURABILITY = "exit"
+
 class AgentConfig:
     """Configuration class for the agent."""
-    def __init__(self):
+    def __init__(self, session_id: Optional[str] = None):
         self.temperature = 0.2
         self.max_tokens = 2000
-        self.stream_mode = "values"
-        self.thread_id = f"chat-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        # "messages" streams token deltas; "values" yields full state snapshots (debug)
+        self.stream_mode = "messages"
+        # Token deltas are coalesced before being yielded. A batch starts at
+        # min_batch chunks so the first token goes out immediately, grows by
+        # growth_factor after each flush up to max_batch, and is flushed early
+        # once flush_interval seconds have passed.
+        self.min_batch = 1
+        self.max_batch = 25
+        self.growth_factor = 3
+        self.flush_interval = 0.05
+        # Seconds read-only Gmail/Calendar tool results are reused for
+        self.cache_ttl = TOOL_CACHE_TTL
+        # Queries above these limits are rejected before reaching the model
+        self.max_query_chars = 32000
+        self.max_query_tokens = 8000
+        # Wall-clock budget in seconds for a whole run_agent call (None disables)
+        self.total_timeout: Optional[float] = 120.0
+        # echo writes the response text to stdout as it streams; verbose
+        # additionally pretty-prints every message in "values" mode (debug)
+        self.echo = True
+        self.verbose = False
+        # Per-node/tool timing and token usage; off by default
+        self.profile = False
+        self.profile_output: Optional[str] = None
+        # Reuse one config (or pass the same session_id) to keep conversation memory
+        self.thread_id = f"chat-{session_id or uuid.uuid4().hex}"
 
 @lru_cache(maxsize=1)
-def get_llm_model() -> AzureChatOpenAI:
-    """Get cached instance of AzureChatOpenAI model."""
+def _get_http_async_client() -> httpx.AsyncClient:
+    """
+    Get the async HTTP client shared by every model for the life of the process.
+
+    Runs from run_agent_sync all happen on one loop, so its connections stay
+    usable and warm between prompts.
+    """
+    return httpx.AsyncClient(limits=AZURE_HTTP_LIMITS, timeout=LLM_REQUEST_TIMEOUT)
+
+@lru_cache(maxsize=8)
+def get_llm_model(temperature: float = 0.2, max_tokens: int = 2000) -> AzureChatOpenAI:
+    """Get cached instance of AzureChatOpenAI model for the given settings."""
     try:
         return AzureChatOpenAI(
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
             openai_api_key=AZURE_OPENAI_API_KEY,
             openai_api_version=AZURE_OPENAI_API_VERSION,
             azure_deployment=AZURE_OPENAI_DEPLOYMENT_NAME,
-            temperature=0.2,
-            max_tokens=2000,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=LLM_REQUEST_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES,
+            # Streamed responses only report token usage when asked to; the
+            # profiler reads it from the final chunk of each model call
+            stream_usage=True,
+            http_async_client=_get_http_async_client(),
         )
     except Exception as e:
-        logger.error(f"Failed to initialize AzureChatOpenAI model: {str(e)}")
+        logger.error("Failed to initialize AzureChatOpenAI model: %s", e)
         raise
 
-@lru_cache(maxsize=1)
-def get_agent() -> Any:
-    """Get cached instance of the agent."""
+@lru_cache(maxsize=8)
+def get_agent(temperature: float = 0.2, max_tokens: int = 2000) -> Any:
+    """Get cached instance of the agent for the given model settings."""
     try:
-        model = get_llm_model()
-        memory = MemorySaver()
-        return create_react_agent(model, TOOLS, checkpointer=memory)
+        model = get_llm_model(temperature, max_tokens)
+        return create_react_agent(model, TOOLS_ASYNC, checkpointer=_CHECKPOINTER)
     except Exception as e:
-        logger.error(f"Failed to create agent: {str(e)}")
+        logger.error("Failed to create agent: %s", e)
         raise
 
-def run_agent(user_query: str, config: Optional[AgentConfig] = None) -> Iterator[Dict[str, Any]]:
+class _StepProfiler:
+    """Accumulates wall time and token usage per graph node or tool during one run."""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._last = time.monotonic()
+
+    @staticmethod
+    def label(message: Any, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Name the step that produced message: the tool name, else the graph node."""
+        if getattr(message, "type", None) == "tool" and getattr(message, "name", None):
+            return f"tool:{message.name}"
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls and tool_calls[0].get("name"):
+            return f"agent->{tool_calls[0]['name']}"
+        if metadata and metadata.get("langgraph_node"):
+            return metadata["langgraph_node"]
+        return getattr(message, "type", "unknown")
+
+    def record(self, label: str, message: Any):
+        """Charge the time since the previous step to label."""
+        now = time.monotonic()
+        entry = self.stats.setdefault(
+            label, {"steps": 0, "seconds": 0.0, "input_tokens": 0, "output_tokens": 0}
+        )
+        entry["steps"] += 1
+        entry["seconds"] += now - self._last
+        self._last = now
+
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            entry["input_tokens"] += usage.get("input_tokens", 0)
+            entry["output_tokens"] += usage.get("output_tokens", 0)
+        else:
+            token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+            entry["input_tokens"] += token_usage.get("prompt_tokens", 0)
+            entry["output_tokens"] += token_usage.get("completion_tokens", 0)
+
+    def resume(self):
+        """Restart the clock so time spent by the consumer is not charged to the agent."""
+        self._last = time.monotonic()
+
+    def report(self, output_path: Optional[str] = None):
+        """Log a summary table and optionally dump the raw stats as JSON."""
+        rows = sorted(self.stats.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        lines = [f"{'step':<40} {'calls':>6} {'seconds':>9} {'tok in':>8} {'tok out':>8}"]
+        for label, entry in rows:
+            lines.append(
+                f"{label:<40} {entry['steps']:>6} {entry['seconds']:>9.3f} "
+                f"{entry['input_tokens']:>8} {entry['output_tokens']:>8}"
+            )
+        logger.info("Agent run profile:\n%s", "\n".join(lines))
+        if output_path:
+            with open(output_path, "w") as f:
+                json.dump(self.stats, f, indent=2)
+
+@lru_cache(maxsize=1)
+def _get_token_encoder() -> Any:
+    """Get the cached tiktoken encoder, or None if it cannot be loaded."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logger.debug("Token counting disabled: %s", e)
+        return None
+
+def check_query_size(user_query: str, config: AgentConfig):
+    """Raise ValueError if the query is too large to send to the model."""
+    if len(user_query) > config.max_query_chars:
+        raise ValueError(
+            f"User query is too long ({len(user_query)} characters, limit is {config.max_query_chars})"
+        )
+    # Byte-level BPE never yields more tokens than UTF-8 bytes (one character
+    # may be several tokens), so queries this small skip encoding
+    if len(user_query.encode("utf-8")) <= config.max_query_tokens:
+        return
+    encoder = _get_token_encoder()
+    if encoder is None:
+        return
+    n_tokens = len(encoder.encode(user_query))
+    if n_tokens > config.max_query_tokens:
+        raise ValueError(
+            f"User query is too long ({n_tokens} tokens, limit is {config.max_query_tokens})"
+        )
+
+class _StreamPrinter:
+    """
+    Echoes streamed response text to stdout.
+
+    Only text not printed yet is written, and stdout is flushed at most once
+    per flush_interval, so long answers cost O(N) output instead of
+    re-rendering the whole message on every step.
+    """
+
+    def __init__(self, flush_interval: float = 0.05):
+        self.flush_interval = flush_interval
+        self._message_id = None
+        self._printed = 0
+        self._wrote = False
+        self._last_flush = 0.0
+
+    def push(self, message: BaseMessage):
+        """Print the unseen tail of a (possibly growing) AI message."""
+        if message.type != "ai" or not isinstance(message.content, str):
+            return
+        if message.id != self._message_id:
+            if self._wrote:
+                self.write("\n\n")
+            self._message_id = message.id
+            self._printed = 0
+        if len(message.content) > self._printed:
+            self.write(message.content[self._printed:])
+            self._printed = len(message.content)
+
+    def write(self, text: str):
+        """Write text and flush if the last flush is old enough."""
+        sys.stdout.write(text)
+        self._wrote = True
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            sys.stdout.flush()
+            self._last_flush = now
+
+    def close(self):
+        """Terminate the output line and flush anything still buffered."""
+        if self._wrote:
+            sys.stdout.write("\n")
+        sys.stdout.flush()
+
+async def run_agent(user_query: str, config: Optional[AgentConfig] = None) -> AsyncIterator[Union[str, Dict[str, Any]]]:
     """
     Configures and runs the productivity agent with the given user query.
-    
+
     Args:
         user_query: The user's question or command
         config: Optional configuration for the agent
-        
+
     Returns:
-        Iterator of agent steps containing response messages
-        
+        Async iterator of coalesced response text in "messages" mode, or of
+        full agent state snapshots in "values" mode
+
     Raises:
-        ValueError: If user_query is empty
+        ValueError: If user_query is empty or exceeds the configured size limits
         Exception: For any other errors during agent execution
     """
     if not user_query.strip():
         raise ValueError("User query cannot be empty")
-    
+
+    # Use provided config or create default
+    agent_config = config or AgentConfig()
+    check_query_size(user_query, agent_config)
+
     try:
-        # Use provided config or create default
-        agent_config = config or AgentConfig()
-        
+        configure_tool_cache(agent_config.cache_ttl)
+
         # Get cached agent instance
-        agent = get_agent()
-        
+        agent = get_agent(agent_config.temperature, agent_config.max_tokens)
+
         # Configure the agent session
         session_config = {
             "configurable": {
@@ -92,20 +304,174 @@ def run_agent(user_query: str, config: Optional[AgentConfig] = None) -> Iterator
             }
         }
         messages = [HumanMessage(content=user_query)]
+        token_mode = agent_config.stream_mode == "messages"
+        buf = []
+        batch_size = agent_config.min_batch
+        last_flush = time.monotonic()
+        profiler = _StepProfiler() if agent_config.profile else None
+        printer = _StreamPrinter(agent_config.flush_interval) if agent_config.echo else None
+
+        # Stream the agent's responses without blocking the event loop
+        stream = agent.astream(
+            {"messages": messages},
+            session_config,
+            stream_mode=agent_config.stream_mode,
+            durability=CHECKPOINT_DURABILITY,
+        )
+        async with aclosing(_iter_with_timeout(stream, agent_config.total_timeout)) as steps:
+            async for step in steps:
+                try:
+                    if not token_mode:
+                        last_message = step["messages"][-1]
+                        if profiler:
+                            profiler.record(profiler.label(last_message), last_message)
+                        if agent_config.verbose:
+                            last_message.pretty_print()
+                        elif printer:
+                            printer.push(last_message)
+                        yield step
+                        if profiler:
+                            profiler.resume()
+                        continue
+
+                    msg_chunk, metadata = step
+                    if profiler:
+                        profiler.record(profiler.label(msg_chunk, metadata), msg_chunk)
+                    # Only the agent's own output is surfaced; tool results, and
+                    # any model calls a tool makes internally, stay internal
+                    is_text = (
+                        isinstance(msg_chunk, AIMessageChunk)
+                        and isinstance(msg_chunk.content, str)
+                        and metadata.get("langgraph_node") == "agent"
+                    )
+                    if is_text and msg_chunk.content:
+                        buf.append(msg_chunk.content)
+
+                    now = time.monotonic()
+                    # Flush on size, on time, or when the model hands over to a tool
+                    if buf and (
+                        not is_text
+                        or len(buf) >= batch_size
+                        or now - last_flush >= agent_config.flush_interval
+                    ):
+                        text = "".join(buf)
+                        buf.clear()
+                        last_flush = now
+                        batch_size = min(batch_size * agent_config.growth_factor, agent_config.max_batch)
+                        if printer:
+                            printer.write(text)
+                        yield text
+                        if profiler:
+                            profiler.resume()
+                except Exception as e:
+                    # Surface the failure; skipping steps would hand back a truncated answer
+                    logger.error("Error processing step: %s", e)
+                    raise
+
+        if buf:
+            text = "".join(buf)
+            if printer:
+                printer.write(text)
+            yield text
+
+        if printer:
+            printer.close()
+
+        if profiler:
+            profiler.report(agent_config.profile_output)
 
-        # Stream the agent's responses
-        for step in agent.stream(
-            {"messages": messages}, 
-            session_config, 
-            stream_mode=agent_config.stream_mode
-        ):
-            try:
-                step["messages"][-1].pretty_print()
-                yield step
-            except Exception as e:
-                logger.error(f"Error processing step: {str(e)}")
-                continue
-                
     except Exception as e:
-        logger.error(f"Agent execution failed: {str(e)}")
-        raise
\ No newline at end of file
+        logger.error("Agent execution failed: %s", e)
+        raise
+
+async def _iter_with_timeout(stream: AsyncIterator[Any], timeout: Optional[float]) -> AsyncIterator[Any]:
+    """
+    Iterate stream, raising TimeoutError once timeout seconds have passed.
+
+    The stream is consumed by a single producer task, so the timeout also cuts
+    off a step stalled inside a model or tool call, and the stream is always
+    closed by the task that iterated it, even when the caller stops early.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    async def produce():
+        try:
+            async with aclosing(stream):
+                async for step in stream:
+                    await queue.put((True, step))
+        except Exception as e:
+            await queue.put((False, e))
+        else:
+            await queue.put((False, None))
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                is_step, item = await asyncio.wait_for(queue.get(), remaining)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Agent run exceeded {timeout}s") from None
+            if not is_step:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.wait({producer})
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the process-wide event loop that synchronous callers drive agent runs on.
+
+    The cached model's async HTTP pool is bound to the loop it first ran on,
+    so every run shares one long-lived loop in a daemon thread instead of a
+    fresh loop per call.
+    """
+    global _event_loop
+    if _event_loop is None:
+        with _event_loop_lock:
+            if _event_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="agent-event-loop", daemon=True).start()
+                _event_loop = loop
+    return _event_loop
+
+def run_agent_sync(user_query: str, config: Optional[AgentConfig] = None) -> Iterator[Union[str, Dict[str, Any]]]:
+    """
+    Synchronous wrapper around run_agent for the CLI and the Streamlit app.
+
+    Drives the async generator on the shared agent event loop and yields each
+    step in the calling thread as soon as it is produced. If the caller stops
+    early or is interrupted (e.g. Ctrl-C), the run is cancelled and allowed to
+    unwind before this returns.
+    """
+    items: "queue.Queue" = queue.Queue()
+    done = object()
+    finished = threading.Event()
+
+    async def pump():
+        try:
+            async with aclosing(run_agent(user_query, config)) as steps:
+                async for step in steps:
+                    items.put(step)
+        finally:
+            items.put(done)
+            finished.set()
+
+    future = asyncio.run_coroutine_threadsafe(pump(), _get_event_loop())
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+        # Re-raise anything the run failed with
+        future.result()
+    finally:
+        if not finished.is_set():
+            future.cancel()
+            # Let the stream close (and its checkpoint be written) before returning
+            finished.wait(RUN_CANCEL_GRACE)
@@ -3,28 +3,103 @@ Authentication manager that handles all authentication flows for the productivit
 This includes Azure OpenAI, Gmail, and Google Calendar authentication.
 """
 import os
-import pickle
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Any, Optional, Set
+import httplib2
 import streamlit as st
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 from google.oauth2.credentials import Credentials
 from dotenv import load_dotenv
-from functools import lru_cache
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entry point
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# (scopes, token file, OAuth client secrets file) for each Google service
+GMAIL_AUTH = (
+    ["https://www.googleapis.com/auth/gmail.readonly"],
+    "token_gmail.json",
+    'credentials_gmail_api.json',
+)
+CALENDAR_AUTH = (
+    ['https://www.googleapis.com/auth/calendar'],
+    'token_calendar.json',
+    'credentials_calendar_api.json',
+)
+
+# Socket timeout for Google API calls, in seconds
+GOOGLE_HTTP_TIMEOUT = 30
+
+# Access tokens are refreshed in the background once they are this close to
+# expiring. google-auth would otherwise refresh inline, less than four minutes
+# before expiry, stalling whichever API call hits the threshold.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+
+# Retries for idempotent Google API calls. googleapiclient retries 429s, 5xx
+# and rate-limit 403s with randomized exponential backoff.
+GOOGLE_API_RETRIES = 3
+
+_thread_local = threading.local()
+
+def _get_thread_http() -> httplib2.Http:
+    """
+    Get the calling thread's keep-alive connection pool for Google APIs.
+
+    httplib2.Http is not thread-safe and tools run in worker threads, so each
+    thread gets its own pool; the Gmail and Calendar services share it.
+    """
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = _thread_local.http = httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT)
+    return http
+
+def _build_google_service(name: str, version: str, creds: Credentials,
+                          before_request: Optional[Callable[[], None]] = None):
+    """
+    Build a Google API service whose requests go over the calling thread's pool.
+
+    before_request, if given, is called each time a request is built.
+    """
+    def request_builder(http, *args, **kwargs):
+        if before_request is not None:
+            before_request()
+        return HttpRequest(AuthorizedHttp(creds, http=_get_thread_http()), *args, **kwargs)
+
+    # static_discovery loads the API description bundled with the client
+    # library instead of fetching it over the network
+    return build(
+        name,
+        version,
+        http=AuthorizedHttp(creds, http=_get_thread_http()),
+        requestBuilder=request_builder,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+
 class AuthManager:
     def __init__(self):
         """Initialize the authentication manager."""
         self.gmail_creds = None
         self.calendar_creds = None
+        self._gmail_service = None
+        self._calendar_service = None
+        # Tools run in worker threads; only one of them may authenticate and
+        # build a service
+        self._service_lock = threading.Lock()
+        # Credentials already loaded in this process, keyed by token file path
+        self._token_cache: Dict[str, Credentials] = {}
+        # Token paths with a background refresh in progress
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
         self._validate_env_vars()
         self.azure_openai_config = {
             "api_key": os.getenv("AZURE_OPENAI_API_KEY"),
@@ -48,69 +123,143 @@ class AuthManager:
     def authenticate_all(self) -> bool:
         """Authenticate all services and return True if all successful."""
         try:
+            if not (self.gmail_creds and self.gmail_creds.valid
+                    and self.calendar_creds and self.calendar_creds.valid):
+                self._refresh_expired_concurrently()
+            # Any service still lacking valid creds falls through to the
+            # interactive flow here, one at a time.
             self._authenticate_gmail()
             self._authenticate_calendar()
             return True
         except Exception as e:
-            logger.error(f"Authentication failed: {str(e)}")
+            logger.error("Authentication failed: %s", e)
             st.error(f"Authentication failed: {str(e)}")
             return False
 
+    def _refresh_expired_concurrently(self):
+        """Refresh expired Gmail and Calendar tokens in parallel."""
+        pending = []
+        for scopes, token_path, _ in (GMAIL_AUTH, CALENDAR_AUTH):
+            creds = self._load_creds(scopes, token_path)
+            if creds and creds.expired and creds.refresh_token:
+                pending.append((creds, token_path))
+
+        if len(pending) < 2:
+            # Nothing to overlap; the regular path handles a single refresh
+            return
+
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [executor.submit(self._refresh_creds, creds, token_path) for creds, token_path in pending]
+            for future in futures:
+                future.result()
+
+    def _load_creds(self, scopes: list, token_path: str) -> Optional[Credentials]:
+        """Return in-memory or on-disk credentials for token_path, if any."""
+        creds = self._token_cache.get(token_path)
+        if creds is None and os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
+            self._token_cache[token_path] = creds
+        return creds
+
+    def _refresh_creds(self, creds: Credentials, token_path: str) -> Credentials:
+        """Refresh expired credentials and persist the new tokens."""
+        creds.refresh(Request())
+        self._save_token(token_path, creds)
+        self._token_cache[token_path] = creds
+        return creds
+
+    def _refresh_ahead(self, creds: Credentials, token_path: str):
+        """Start a background refresh if creds expire within TOKEN_REFRESH_MARGIN."""
+        if not creds.refresh_token or creds.expiry is None:
+            return
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if creds.expiry - now > TOKEN_REFRESH_MARGIN:
+            return
+        with self._refresh_lock:
+            if token_path in self._refreshing:
+                return
+            self._refreshing.add(token_path)
+        threading.Thread(
+            target=self._background_refresh, args=(creds, token_path), name="token-refresh", daemon=True
+        ).start()
+
+    def _background_refresh(self, creds: Credentials, token_path: str):
+        try:
+            self._refresh_creds(creds, token_path)
+        except Exception as e:
+            # The next request refreshes inline as before
+            logger.warning("Background token refresh for %s failed: %s", token_path, e)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(token_path)
+
     def _authenticate_service(self, scopes: list, token_path: str, credentials_file: str) -> Credentials:
         """Generic authentication method for Google services."""
-        creds = None
-        
         try:
-            if os.path.exists(token_path):
-                with open(token_path, "rb") as token:
-                    creds = pickle.load(token)
+            creds = self._load_creds(scopes, token_path)
             
             if not creds or not creds.valid:
                 if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
+                    creds = self._refresh_creds(creds, token_path)
                 else:
                     flow = InstalledAppFlow.from_client_secrets_file(credentials_file, scopes)
                     creds = flow.run_local_server(port=0)
-                
-                with open(token_path, 'wb') as token:
-                    pickle.dump(creds, token)
+                    self._save_token(token_path, creds)
             
+            self._token_cache[token_path] = creds
             return creds
         except Exception as e:
-            logger.error(f"Authentication error for {token_path}: {str(e)}")
+            logger.error("Authentication error for %s: %s", token_path, e)
+            raise
+
+    @staticmethod
+    def _save_token(token_path: str, creds: Credentials):
+        """Atomically write credentials to token_path as JSON."""
+        token_dir = os.path.dirname(os.path.abspath(token_path))
+        fd, tmp_path = tempfile.mkstemp(dir=token_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as token:
+                token.write(creds.to_json())
+            os.replace(tmp_path, token_path)
+        except Exception:
+            os.unlink(tmp_path)
             raise
 
     def _authenticate_gmail(self):
         """Handle Gmail authentication."""
-        SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
-        self.gmail_creds = self._authenticate_service(
-            SCOPES, 
-            "token_gmail.pickle", 
-            'credentials_gmail_api.json'
-        )
+        self.gmail_creds = self._authenticate_service(*GMAIL_AUTH)
 
     def _authenticate_calendar(self):
         """Handle Google Calendar authentication."""
-        SCOPES = ['https://www.googleapis.com/auth/calendar']
-        self.calendar_creds = self._authenticate_service(
-            SCOPES, 
-            'token_calendar.pickle', 
-            'credentials_calendar_api.json'
-        )
-
-    @lru_cache(maxsize=1)
+        self.calendar_creds = self._authenticate_service(*CALENDAR_AUTH)
+
     def get_gmail_service(self):
-        """Get authenticated Gmail service with caching."""
-        if not self.gmail_creds:
-            self._authenticate_gmail()
-        return build("gmail", "v1", credentials=self.gmail_creds)
+        """Get authenticated Gmail service, built once per manager."""
+        # Double-checked: after the first build this is a plain attribute read
+        if self._gmail_service is None:
+            with self._service_lock:
+                if self._gmail_service is None:
+                    if not self.gmail_creds:
+                        self._authenticate_gmail()
+                    creds = self.gmail_creds
+                    self._gmail_service = _build_google_service(
+                        "gmail", "v1", creds, before_request=lambda: self._refresh_ahead(creds, GMAIL_AUTH[1])
+                    )
+        return self._gmail_service
 
-    @lru_cache(maxsize=1)
     def get_calendar_service(self):
-        """Get authenticated Google Calendar service with caching."""
-        if not self.calendar_creds:
-            self._authenticate_calendar()
-        return build('calendar', 'v3', credentials=self.calendar_creds)
+        """Get authenticated Google Calendar service, built once per manager."""
+        if self._calendar_service is None:
+            with self._service_lock:
+                if self._calendar_service is None:
+                    if not self.calendar_creds:
+                        self._authenticate_calendar()
+                    creds = self.calendar_creds
+                    self._calendar_service = _build_google_service(
+                        'calendar', 'v3', creds, before_request=lambda: self._refresh_ahead(creds, CALENDAR_AUTH[1])
+                    )
+        return self._calendar_service
 
     def get_azure_openai_config(self) -> Dict[str, str]:
         """Get Azure OpenAI configuration."""
@@ -17,4 +17,8 @@ TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 LANGSMITH_TRACING = os.getenv("LANGSMITH_TRACING", "false").lower() == "true"
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 LANGSMITH_PROJECT = os.getenv("LANGSMITH_PROJECT")
-LANGSMITH_ENDPOINT = os.getenv("LANGSMITH_ENDPOINT")
\ No newline at end of file
+LANGSMITH_ENDPOINT = os.getenv("LANGSMITH_ENDPOINT")
+
+# Agent tools
+# Seconds that read-only Gmail/Calendar tool results are reused for
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "30"))
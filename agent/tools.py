@@ -2,21 +2,163 @@
 Tools module providing various productivity-related functions for the agent.
 Includes tools for web search, email management, and calendar operations.
 """
+import asyncio
+import logging
 import os
+import threading
+import traceback
+import types
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
-from langchain.tools import tool
+from cachetools import TTLCache
+
+from langchain_core.tools import StructuredTool, tool
 from langchain_community.tools.tavily_search import TavilySearchResults
 from utils.email_parser import parse_email
 from utils.gmail_client import GmailClient
 from utils.google_calendar_client import GoogleCalendarClient
 from agent.auth_manager import AuthManager
+from agent.config import TAVILY_API_KEY, TOOL_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# googleapiclient decodes every Gmail/Calendar response with the stdlib json
+# module; swap in orjson when it is installed.
+try:
+    import orjson
+except ImportError:  # optional: responses are parsed with json
+    orjson = None
+
+if orjson is not None:
+    import googleapiclient.model as _gapi_model
+
+    _gapi_model.json = types.SimpleNamespace(
+        loads=orjson.loads,
+        dumps=lambda obj, **kwargs: orjson.dumps(obj).decode(),
+        decoder=types.SimpleNamespace(JSONDecodeError=orjson.JSONDecodeError),
+        JSONDecodeError=orjson.JSONDecodeError,
+    )
 
 # Initialize authentication manager
 auth_manager = AuthManager()
 
+# Short-lived cache for read-only API results; the agent often repeats the
+# same lookup several times within one conversation turn.
+_tool_cache = TTLCache(maxsize=32, ttl=TOOL_CACHE_TTL)
+_tool_cache_lock = threading.Lock()
+
+_MISS = object()
+
+def _cache_get(key: Hashable) -> Any:
+    """Return the cached result for key, or _MISS."""
+    with _tool_cache_lock:
+        return _tool_cache.get(key, _MISS)
+
+def _cache_put(key: Hashable, result: Any):
+    with _tool_cache_lock:
+        _tool_cache[key] = result
+
+# Fetches in progress, so concurrent misses on one key wait for a single call
+_inflight_calls: Dict[Hashable, Future] = {}
+
+def _cached_call(key: Hashable, fetch: Callable[[], Any],
+                 cacheable: Callable[[Any], bool] = lambda result: True) -> Any:
+    """Return the cached result for key, calling fetch on a miss; results failing cacheable are not stored."""
+    with _tool_cache_lock:
+        result = _tool_cache.get(key, _MISS)
+        if result is not _MISS:
+            return result
+        pending = _inflight_calls.get(key)
+        if pending is None:
+            pending = _inflight_calls[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return pending.result()
+
+    try:
+        result = fetch()
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    else:
+        if cacheable(result):
+            _cache_put(key, result)
+        pending.set_result(result)
+        return result
+    finally:
+        with _tool_cache_lock:
+            _inflight_calls.pop(key, None)
+
+def configure_tool_cache(ttl: float):
+    """Set how long read-only tool results are cached, in seconds."""
+    global _tool_cache
+    with _tool_cache_lock:
+        if _tool_cache.ttl != ttl:
+            _tool_cache = TTLCache(maxsize=_tool_cache.maxsize, ttl=ttl)
+
+# Bumped whenever the cache is invalidated, i.e. after a tool wrote data;
+# answers cached outside this module can be keyed on it
+_cache_generation = 0
+
+def invalidate_tool_cache():
+    """Drop all cached tool results."""
+    global _cache_generation
+    with _tool_cache_lock:
+        _tool_cache.clear()
+        _cache_generation += 1
+
+def tool_cache_generation() -> int:
+    """Return a counter that changes every time cached tool results are invalidated."""
+    return _cache_generation
+
+def _tool_error(message: str, e: Exception) -> str:
+    """Format a tool failure for the model; the traceback is only added at DEBUG level."""
+    # Exception name and message only; reprs of API errors carry URLs and response bodies
+    error = f"{message}: {type(e).__name__}: {e}"
+    if logger.isEnabledFor(logging.DEBUG):
+        return f"{error}\nDetails: {traceback.format_exc()}"
+    return error
+
+@lru_cache(maxsize=1)
+def _get_gmail_client() -> GmailClient:
+    """Get the shared Gmail client, created on first use."""
+    return GmailClient(auth_manager)
+
+@lru_cache(maxsize=1)
+def _get_calendar_client() -> GoogleCalendarClient:
+    """Get the shared Google Calendar client, created on first use."""
+    return GoogleCalendarClient(auth_manager)
+
 # --- Web Search Tool ---
+# The shared client always fetches this many results; callers slice them down
+TAVILY_MAX_RESULTS = 10
+
+def _build_tavily_client(api_key: str) -> TavilySearchResults:
+    return TavilySearchResults(max_results=TAVILY_MAX_RESULTS, tavily_api_key=api_key)
+
+# Built once so its HTTP connection pool is reused across searches
+_tavily_client = _build_tavily_client(TAVILY_API_KEY) if TAVILY_API_KEY else None
+
+def _get_tavily_client() -> TavilySearchResults:
+    """Get the shared Tavily client, building it on first use if the key was set after import."""
+    global _tavily_client
+    if _tavily_client is None:
+        tavily_api_key = os.getenv("TAVILY_API_KEY")
+        if not tavily_api_key:
+            raise ValueError("TAVILY_API_KEY environment variable is required")
+        _tavily_client = _build_tavily_client(tavily_api_key)
+    return _tavily_client
+
+def _search_cache_key(query: str) -> tuple:
+    """Cache key for a search; queries differing only in case or spacing share results."""
+    return ("tavily", " ".join(query.lower().split()))
+
 @tool
 def tavily_tool(query: str, max_results: int = 2) -> List[Dict]:
     """
@@ -32,14 +174,25 @@ def tavily_tool(query: str, max_results: int = 2) -> List[Dict]:
     Raises:
         ValueError: If TAVILY_API_KEY environment variable is not set
     """
-    tavily_api_key = os.getenv("TAVILY_API_KEY")
-    if not tavily_api_key:
-        raise ValueError("TAVILY_API_KEY environment variable is required")
-    
-    search_tool = TavilySearchResults(max_results=max_results, tavily_api_key=tavily_api_key)
-    return search_tool.search(query)
+    # Tavily reports failures as an error string instead of raising; only lists are cached
+    results = _cached_call(
+        _search_cache_key(query),
+        lambda: _get_tavily_client().invoke({"query": query}),
+        cacheable=lambda results: isinstance(results, list),
+    )
+    return results[:max_results] if isinstance(results, list) else results
 
 # --- Email Tools ---
+# Upper bound on how many emails a single tool call may pull
+MAX_EMAILS = 100
+
+def _format_emails(emails: List[dict]) -> str:
+    """Render email summaries as sender/subject/snippet blocks."""
+    return "\n\n".join(
+        f"From: {e['from']}\nSubject: {e['subject']}\nSnippet: {e['snippet']}"
+        for e in emails
+    )
+
 @tool
 def parse_email_tool(raw_email: str) -> Dict:
     """
@@ -59,28 +212,22 @@ def get_gmail_summary(n: int = 15) -> str:
     Retrieves a summary of recent Gmail messages.
 
     Args:
-        n: Number of recent emails to fetch (default: 15)
+        n: Number of recent emails to fetch (default: 15, max: 100)
 
     Returns:
         Formatted string containing sender and subject for each email
     """
+    n = min(n, MAX_EMAILS)
     try:
-        client = GmailClient(auth_manager)
-        emails = client.get_recent_emails(max_results=n)
+        client = _get_gmail_client()
+        emails = _cached_call(("recent_emails", n), lambda: client.get_recent_emails(max_results=n))
         
         if not emails:
             return "No recent emails found."
             
-        email_summaries = []
-        for email in emails:
-            summary = f"From: {email['from']}\nSubject: {email['subject']}\nSnippet: {email['snippet']}"
-            email_summaries.append(summary)
-            
-        return "\n\n".join(email_summaries)
+        return _format_emails(emails)
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        return f"Error retrieving Gmail messages: {str(e)}\nDetails: {error_details}"
+        return _tool_error("Error retrieving Gmail messages", e)
 
 @tool
 def search_gmail_by_keyword(keyword: str, n: int = 15) -> str:
@@ -89,25 +236,21 @@ def search_gmail_by_keyword(keyword: str, n: int = 15) -> str:
 
     Args:
         keyword: Search term to look for in emails
-        n: Maximum number of results to return (default: 15)
+        n: Maximum number of results to return (default: 15, max: 100)
 
     Returns:
         Formatted string containing matching email details
     """
+    n = min(n, MAX_EMAILS)
     try:
-        client = GmailClient(auth_manager)
+        client = _get_gmail_client()
         emails = client.search_emails(keyword, max_results=n)
         if not emails:
             return f"No emails found containing '{keyword}'."
         
-        return "\n\n".join([
-            f"From: {e['from']}\nSubject: {e['subject']}\nSnippet: {e['snippet']}" 
-            for e in emails
-        ])
+        return _format_emails(emails)
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        return f"Error searching Gmail: {str(e)}\nDetails: {error_details}"
+        return _tool_error("Error searching Gmail", e)
 
 # --- Calendar Tools ---
 @tool
@@ -136,8 +279,8 @@ def create_google_event(
     start_dt = datetime.fromisoformat(start_time)
     end_dt = datetime.fromisoformat(end_time)
 
-    client = GoogleCalendarClient(auth_manager)
-    return client.create_event(
+    client = _get_calendar_client()
+    result = client.create_event(
         summary=summary,
         description=description,
         start_time=start_dt,
@@ -145,6 +288,9 @@ def create_google_event(
         attendees=attendees,
         reminders=reminders
     )
+    # The new event (and any invitation emails) must show up on the next read
+    invalidate_tool_cache()
+    return result
 
 @tool
 def get_upcoming_calendar_events(max_results: int = 10) -> str:
@@ -157,19 +303,76 @@ def get_upcoming_calendar_events(max_results: int = 10) -> str:
     Returns:
         Formatted string containing upcoming event details
     """
-    client = GoogleCalendarClient(auth_manager)
-    events = client.get_upcoming_events(max_results=max_results)
+    client = _get_calendar_client()
+    events = _cached_call(
+        ("upcoming_events", max_results),
+        lambda: client.get_upcoming_events(max_results=max_results)
+    )
     
     if not events:
         return "No upcoming events found."
     
-    result = []
-    for event in events:
-        start = event.get('start', {}).get('dateTime', event.get('start', {}).get('date', 'N/A'))
-        summary = event.get('summary', 'Untitled Event')
-        result.append(f"Event: {summary}\nTime: {start}")
-    
-    return "\n\n".join(result)
+    return "\n\n".join(_format_event(event) for event in events)
+
+def _format_event(event: dict) -> str:
+    start = event.get('start', {})
+    return f"Event: {event.get('summary', 'Untitled Event')}\nTime: {start.get('dateTime', start.get('date', 'N/A'))}"
+
+# --- Async variants ---
+# Same names, arguments and descriptions as the tools above, so the model sees
+# an identical toolset. The async agent awaits these, letting the ToolNode run
+# several independent calls concurrently instead of one after another.
+# Searches currently running, so identical calls issued in the same step
+# (the model often repeats a query with a different max_results) share one
+# request instead of each hitting Tavily. Tasks belong to the loop that
+# created them, so entries are keyed by loop as well; a loop can close with a
+# shielded search still pending on it.
+_inflight_searches: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], "asyncio.Task"] = {}
+
+def _prune_inflight_searches():
+    """Drop finished searches and ones stranded on a closed loop."""
+    for inflight_key, task in list(_inflight_searches.items()):
+        if task.done() or inflight_key[0].is_closed():
+            _inflight_searches.pop(inflight_key, None)
+
+async def _fetch_search(key: Hashable, query: str) -> Any:
+    results = await _get_tavily_client().ainvoke({"query": query})
+    if isinstance(results, list):  # not error strings, see tavily_tool
+        _cache_put(key, results)
+    return results
+
+@tool("tavily_tool", description=tavily_tool.description)
+async def tavily_tool_async(query: str, max_results: int = 2) -> List[Dict]:
+    key = _search_cache_key(query)
+    results = _cache_get(key)
+    if results is _MISS:
+        _prune_inflight_searches()
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = _inflight_searches.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(_fetch_search(key, query))
+            _inflight_searches[inflight_key] = task
+            task.add_done_callback(lambda _: _inflight_searches.pop(inflight_key, None))
+        # Shielded so one caller being cancelled doesn't abort the others' search
+        results = await asyncio.shield(task)
+    return results[:max_results] if isinstance(results, list) else results
+
+def _to_async_tool(sync_tool: StructuredTool) -> StructuredTool:
+    """Wrap a blocking tool so it runs in a worker thread when awaited."""
+    async def _arun(**kwargs):
+        return await asyncio.to_thread(sync_tool.func, **kwargs)
+
+    return StructuredTool.from_function(
+        coroutine=_arun,
+        name=sync_tool.name,
+        description=sync_tool.description,
+        args_schema=sync_tool.args_schema,
+    )
+
+get_gmail_summary_async = _to_async_tool(get_gmail_summary)
+search_gmail_by_keyword_async = _to_async_tool(search_gmail_by_keyword)
+create_google_event_async = _to_async_tool(create_google_event)
+get_upcoming_calendar_events_async = _to_async_tool(get_upcoming_calendar_events)
 
 # Available tools for the agent
 TOOLS = [
@@ -180,3 +383,13 @@ TOOLS = [
     create_google_event,
     get_upcoming_calendar_events
 ]
+
+# Tools for agents driven through astream (see agent.agent_runner.run_agent)
+TOOLS_ASYNC = [
+    tavily_tool_async,
+    parse_email_tool,
+    get_gmail_summary_async,
+    search_gmail_by_keyword_async,
+    create_google_event_async,
+    get_upcoming_calendar_events_async
+]
@@ -0,0 +1,42 @@
+"""
+Shared fixtures for the Google API checks in test_gmail.py and test_calendar.py.
+
+These run against the real Gmail and Calendar APIs using the credentials in the
+project directory, and are skipped when those are missing. Every client is
+built once per test session, so the whole run authenticates and builds each
+Google service a single time.
+"""
+import os
+
+import pytest
+
+from agent.auth_manager import AuthManager, CALENDAR_AUTH, GMAIL_AUTH
+from utils.gmail_client import GmailClient
+from utils.google_calendar_client import GoogleCalendarClient
+
+
+def _has_credentials(auth) -> bool:
+    _, token_path, credentials_file = auth
+    return os.path.exists(token_path) or os.path.exists(credentials_file)
+
+
+@pytest.fixture(scope="session")
+def auth_manager():
+    try:
+        return AuthManager()
+    except ValueError as e:  # required environment variables missing
+        pytest.skip(str(e))
+
+
+@pytest.fixture(scope="session")
+def gmail_client(auth_manager):
+    if not _has_credentials(GMAIL_AUTH):
+        pytest.skip("Gmail credentials not found")
+    return GmailClient(auth_manager)
+
+
+@pytest.fixture(scope="session")
+def calendar_client(auth_manager):
+    if not _has_credentials(CALENDAR_AUTH):
+        pytest.skip("Google Calendar credentials not found")
+    return GoogleCalendarClient(auth_manager)
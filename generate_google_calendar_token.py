@@ -1,7 +1,7 @@
 import os
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-import pickle
+from google.oauth2.credentials import Credentials
 
 # The API scope required to interact with Google Calendar
 SCOPES = ['https://www.googleapis.com/auth/calendar']
@@ -11,9 +11,8 @@ def generate_token():
 
     # The token file stores the user's access and refresh tokens and is created automatically
     # when the authorization flow completes for the first time.
-    if os.path.exists('token_calendar.pickle'):
-        with open('token_calendar.pickle', 'rb') as token:
-            creds = pickle.load(token)
+    if os.path.exists('token_calendar.json'):
+        creds = Credentials.from_authorized_user_file('token_calendar.json', SCOPES)
 
     # If there are no (valid) credentials available, let the user log in.
     if not creds or not creds.valid:
@@ -25,8 +24,8 @@ def generate_token():
             creds = flow.run_local_server(port=0)
 
         # Save the credentials for the next run
-        with open('token_calendar.pickle', 'wb') as token:
-            pickle.dump(creds, token)
+        with open('token_calendar.json', 'w') as token:
+            token.write(creds.to_json())
 
     print("Token for Google Calendar generated successfully!")
 
@@ -1,7 +1,12 @@
-from agent.agent_runner import run_agent
+import logging
+
+from agent.agent_runner import AgentConfig, run_agent_sync
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     print("🧠 Productivity Agent is ready.")
+    # One config per CLI session so follow-up questions share memory
+    config = AgentConfig()
     
     try:
         while True:
@@ -11,7 +16,14 @@ if __name__ == "__main__":
                 break
                 
             # Consume the iterator to display all responses
-            for _ in run_agent(query):
-                pass
+            try:
+                for _ in run_agent_sync(query, config):
+                    pass
+            except ValueError as e:
+                # Empty or oversized query, rejected before reaching the model
+                print(f"\n⚠️ {e}")
+            except TimeoutError as e:
+                # Only this query is abandoned; the session carries on
+                print(f"\n⏱️ {e}. Please try again or simplify the request.")
     except KeyboardInterrupt:
         print("\nGoodbye! 👋")
\ No newline at end of file
@@ -1,12 +1,20 @@
+import logging
 import streamlit as st
-import os
-import random
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage
-from langchain_openai import AzureChatOpenAI
-from agent.tools import TOOLS
-from agent.auth_manager import AuthManager
+import uuid
+from langchain_core.messages import AIMessage, HumanMessage
+from agent.agent_runner import AgentConfig, check_query_size, get_agent, run_agent_sync
+from agent.tools import auth_manager, tool_cache_generation
+from streamlit_assets import (
+    APP_CSS,
+    EXAMPLE_PROMPTS_HEADING_HTML,
+    MAIN_HEADER_HTML,
+    SIDEBAR_BRAND_HTML,
+    SIDEBAR_QUICK_ACTIONS_HTML,
+    SIDEBAR_SECTIONS_HTML,
+    STATUS_BADGES_HTML,
+)
+
+logging.basicConfig(level=logging.INFO)
 
 # --- Streamlit page config ---
 st.set_page_config(
@@ -17,78 +25,11 @@ st.set_page_config(
 )
 
 # Custom CSS for dark theme
-st.markdown("""
-    <style>
-    /* Main app */
-    .stApp {
-        background-color: #1E1E1E;
-        color: #E0E0E0;
-    }
-    
-    /* Sidebar */
-    .css-1d391kg {
-        background-color: #252526;
-    }
-    
-    /* Headers */
-    h1, h2, h3, h4, h5, h6 {
-        color: #E0E0E0 !important;
-    }
-    
-    /* Feature cards */
-    .feature-card {
-        background-color: #2D2D2D;
-        border-radius: 8px;
-        padding: 20px;
-        margin: 10px 0;
-        border: 1px solid #3E3E3E;
-    }
-    
-    /* Status badges */
-    .status-badge {
-        background-color: #2D2D2D;
-        color: #E0E0E0;
-        padding: 8px 16px;
-        border-radius: 20px;
-        font-size: 0.9em;
-        margin: 5px;
-        border: 1px solid #3E3E3E;
-        display: inline-flex;
-        align-items: center;
-        gap: 8px;
-    }
-    
-    .status-badge.connected {
-        border-color: #4CAF50;
-    }
-    
-    /* Custom button styling */
-    .stButton > button {
-        background: rgba(0, 198, 255, 0.05) !important;
-        border: 1px solid #2D2D2D !important;
-        color: #E0E0E0 !important;
-        padding: 12px 20px !important;
-        border-radius: 8px !important;
-        cursor: pointer !important;
-        transition: all 0.3s ease !important;
-        text-align: left !important;
-        width: 100% !important;
-        margin: 5px 0 !important;
-        font-size: 1em !important;
-    }
-    
-    .stButton > button:hover {
-        background: rgba(0, 198, 255, 0.1) !important;
-        border-color: #00C6FF !important;
-        box-shadow: 0 4px 12px rgba(0, 198, 255, 0.1) !important;
-    }
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
-    /* Grid spacing */
-    div[data-testid="stHorizontalBlock"] {
-        gap: 1rem;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Repaint the streaming answer at most this often (seconds); faster Azure
+# streams would otherwise send a websocket update per token
+STREAM_REFRESH_INTERVAL = 0.05
 
 # Example prompts
 EXAMPLE_PROMPTS = [
@@ -100,190 +41,151 @@ EXAMPLE_PROMPTS = [
     "Analyze the sentiment of my last 5 emails"
 ]
 
+# Example prompts that only read data. Their answers are shared across
+# sessions for EXAMPLE_RESPONSE_TTL seconds, so repeat clicks skip the model;
+# the event-creating prompt is left out so every click still creates it.
+CACHED_EXAMPLE_PROMPTS = frozenset(EXAMPLE_PROMPTS) - {
+    "Create a calendar event for team meeting tomorrow at 2 PM",
+}
+EXAMPLE_RESPONSE_TTL = 5 * 60
+
 # --- Sidebar ---
 with st.sidebar:
     # Modern logo and branding
-    st.markdown("""
-        <div style='display: flex; align-items: center; margin-bottom: 25px; padding: 15px 10px;'>
-            <div style='background: linear-gradient(135deg, #00C6FF 0%, #0072FF 100%); width: 40px; height: 40px; border-radius: 12px; display: flex; align-items: center; justify-content: center; margin-right: 15px; box-shadow: 0 4px 12px rgba(0, 198, 255, 0.2);'>
-                <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
-                    <path d="M12 3L20 7.5V16.5L12 21L4 16.5V7.5L12 3Z" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
-                    <path d="M12 8L16 10.5V15.5L12 18L8 15.5V10.5L12 8Z" fill="white"/>
-                </svg>
-            </div>
-            <div>
-                <div style='font-size: 1.4em; font-weight: 600; color: #E0E0E0; margin-bottom: 2px;'>TaskMind AI</div>
-                <div style='font-size: 0.8em; color: #888888;'>Intelligent Productivity</div>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("<p style='color: #888888; font-size: 1.2em; margin: 20px 0;'>Quick Actions</p>", unsafe_allow_html=True)
-    
-    # Email Management Section
-    st.markdown("""
-        <div style='margin: 20px 0;'>
-            <div style='display: flex; align-items: center; margin-bottom: 10px;'>
-                <span style='font-size: 1.2em; margin-right: 8px;'>📧</span>
-                <span style='font-size: 1.2em; color: #E0E0E0;'>Email Management</span>
-            </div>
-            <div style='margin-left: 28px; color: #888888;'>
-                • Search and filter emails<br>
-                • Analyze email sentiment<br>
-                • Extract tasks from emails
-            </div>
-        </div>
-        <div style='height: 1px; background: #3E3E3E; margin: 20px 0;'></div>
-    """, unsafe_allow_html=True)
-    
-    # Calendar Section
-    st.markdown("""
-        <div style='margin: 20px 0;'>
-            <div style='display: flex; align-items: center; margin-bottom: 10px;'>
-                <span style='font-size: 1.2em; margin-right: 8px;'>📅</span>
-                <span style='font-size: 1.2em; color: #E0E0E0;'>Calendar</span>
-            </div>
-            <div style='margin-left: 28px; color: #888888;'>
-                • View upcoming events<br>
-                • Create new events<br>
-                • Set reminders
-            </div>
-        </div>
-        <div style='height: 1px; background: #3E3E3E; margin: 20px 0;'></div>
-    """, unsafe_allow_html=True)
-    
-    # Task Management Section
-    st.markdown("""
-        <div style='margin: 20px 0;'>
-            <div style='display: flex; align-items: center; margin-bottom: 10px;'>
-                <span style='font-size: 1.2em; margin-right: 8px;'>✅</span>
-                <span style='font-size: 1.2em; color: #E0E0E0;'>Task Management</span>
-            </div>
-            <div style='margin-left: 28px; color: #888888;'>
-                • Track pending tasks<br>
-                • Set priorities<br>
-                • Get task summaries
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(SIDEBAR_BRAND_HTML, unsafe_allow_html=True)
+    st.markdown(SIDEBAR_QUICK_ACTIONS_HTML, unsafe_allow_html=True)
+    # Email Management, Calendar and Task Management sections
+    st.markdown(SIDEBAR_SECTIONS_HTML, unsafe_allow_html=True)
 
 # --- Main content ---
-st.markdown("""
-    <div style='text-align: center; padding: 20px 0 40px 0;'>
-        <h1 style='font-size: 2.5em; font-weight: 600; margin: 0; padding: 0;'>TaskMind AI</h1>
-        <div style='height: 10px;'></div>
-        <p style='font-size: 1.1em; color: #888888; margin: 0; padding: 0;'>Your intelligent AI assistant for seamless productivity</p>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(MAIN_HEADER_HTML, unsafe_allow_html=True)
 
 # Status badges with updated styling
-st.markdown("""
-    <div style='display: flex; justify-content: center; gap: 20px; margin-bottom: 30px;'>
-        <div class='status-badge connected' style='background: rgba(0, 198, 255, 0.1); border-color: #00C6FF;'>
-            <span>📧</span><span>Gmail Connected</span>
-        </div>
-        <div class='status-badge connected' style='background: rgba(0, 198, 255, 0.1); border-color: #00C6FF;'>
-            <span>📅</span><span>Calendar Connected</span>
-        </div>
-        <div class='status-badge connected' style='background: rgba(0, 198, 255, 0.1); border-color: #00C6FF;'>
-            <span>🤖</span><span>AI Ready</span>
-        </div>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(STATUS_BADGES_HTML, unsafe_allow_html=True)
 
-# Initialize authentication manager
+# Authenticate once per server process, so the tools' first call needs no
+# OAuth round trip; Streamlit reruns the whole script on every interaction
 @st.cache_resource
-def get_auth_manager():
-    return AuthManager()
-
-auth_manager = get_auth_manager()
-
-# Initialize agent
-@st.cache_resource
-def initialize_agent():
+def authenticate_services() -> bool:
     if not auth_manager.authenticate_all():
         st.error("Failed to authenticate services. Please check your credentials and try again.")
         st.stop()
-    
-    azure_config = auth_manager.get_azure_openai_config()
-    model = AzureChatOpenAI(
-        azure_endpoint=azure_config["endpoint"],
-        openai_api_key=azure_config["api_key"],
-        openai_api_version=azure_config["api_version"],
-        azure_deployment=azure_config["deployment_name"],
-        temperature=0.2,
-    )
-    memory = MemorySaver()
-    return create_react_agent(model, TOOLS, checkpointer=memory)
-
-# Initialize the agent
+    return True
+
+def make_agent_config(session_id: str) -> AgentConfig:
+    """Agent settings for the web UI; runs go through agent_runner like the CLI."""
+    config = AgentConfig(session_id)
+    # Deterministic answers, so a cached example response is as good as a fresh one
+    config.temperature = 0
+    config.flush_interval = STREAM_REFRESH_INTERVAL
+    # The answer is rendered in the page, not echoed to the server's stdout
+    config.echo = False
+    return config
+
+# Initialize services
 with st.spinner("Initializing services..."):
-    agent = initialize_agent()
+    authenticate_services()
 
 # Initialize chat history
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-# Display chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-
-# Example prompts section
-st.markdown("<div style='color: #888888; margin: 30px 0 20px 0; font-size: 1.2em;'>Try asking me:</div>", unsafe_allow_html=True)
-
-# Create columns for the grid
-cols = st.columns(3)
+# One agent config (and so one checkpointer thread) per browser session, so
+# follow-up prompts see the earlier conversation
+if "agent_config" not in st.session_state:
+    st.session_state.agent_config = make_agent_config(f"streamlit-{uuid.uuid4().hex}")
+
+@st.cache_data(ttl=EXAMPLE_RESPONSE_TTL, show_spinner=False)
+def get_example_response(prompt: str, generation: int) -> str:
+    """
+    Answer an example prompt on a scratch thread and return the final text.
+
+    generation is the tool cache generation; it changes whenever a tool
+    writes data (e.g. creates an event), so answers cached before that are
+    not reused.
+    """
+    config = make_agent_config(f"example-{uuid.uuid4().hex}")
+    try:
+        return "".join(run_agent_sync(prompt, config))
+    finally:
+        get_agent(config.temperature, config.max_tokens).checkpointer.delete_thread(config.thread_id)
 
 # Function to handle prompt selection
 def handle_prompt(prompt: str):
+    config = st.session_state.agent_config
+    # Reject oversized input before it enters the history or reaches the model
+    try:
+        check_query_size(prompt, config)
+    except ValueError as e:
+        st.error(f"⚠️ {e}")
+        return
+
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
     
-    config = {"configurable": {"thread_id": f"streamlit-session-{random.randint(1000, 9999)}"}}
-    with st.spinner("🤖 Thinking..."):
-        for step in agent.stream(
-            {"messages": [HumanMessage(content=prompt)]},
-            config,
-            stream_mode="values",
-        ):
-            response = step["messages"][-1].content
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            with st.chat_message("assistant"):
-                st.markdown(response)
-
-# Display prompts in grid
-for i, prompt in enumerate(EXAMPLE_PROMPTS):
-    with cols[i % 3]:
-        # Use a unique key for each button based on both index and prompt content
-        key = f"prompt_{i}_{hash(prompt)}"
-        if st.button(
-            prompt,
-            key=key,
-            use_container_width=True,
-            type="secondary"
-        ):
-            handle_prompt(prompt)
-
-# Chat input
-user_input = st.chat_input(
-    "Ask me anything about your emails, calendar, or tasks...",
-    key="chat_input")
-
-if user_input:
-    st.session_state.messages.append({"role": "user", "content": user_input})
-    with st.chat_message("user"):
-        st.markdown(user_input)
-
-    config = {"configurable": {"thread_id": f"streamlit-session-{random.randint(1000, 9999)}"}}
-    with st.spinner("🤖 Thinking..."):
-        for step in agent.stream(
-            {"messages": [HumanMessage(content=user_input)]},
-            config,
-            stream_mode="values",
-        ):
-            response = step["messages"][-1].content
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            with st.chat_message("assistant"):
+    response = ""
+    with st.chat_message("assistant"):
+        try:
+            if prompt in CACHED_EXAMPLE_PROMPTS:
+                with st.spinner("🤖 Thinking..."):
+                    response = get_example_response(prompt, tool_cache_generation())
                 st.markdown(response)
+                # Record the exchange so follow-up questions in this session see it
+                get_agent(config.temperature, config.max_tokens).update_state(
+                    {"configurable": {"thread_id": config.thread_id}},
+                    {"messages": [HumanMessage(content=prompt), AIMessage(content=response)]},
+                    as_node="agent",
+                )
+            else:
+                # Text batches are appended to a single placeholder instead of
+                # drawing a new bubble with the whole message on every step
+                placeholder = st.empty()
+                with st.spinner("🤖 Thinking..."):
+                    render = placeholder.markdown
+                    for text in run_agent_sync(prompt, config):
+                        response += text
+                        render(response)
+        except TimeoutError as e:
+            # run_agent stops runs past AgentConfig.total_timeout; keep what streamed
+            st.error(f"⏱️ {e}. Please try again or simplify the request.")
+    if response:
+        st.session_state.messages.append({"role": "assistant", "content": response})
+
+# Everything below reruns on its own when a prompt button or the chat input
+# is used, leaving the page chrome above (CSS, sidebar, header) untouched
+@st.fragment
+def chat_panel():
+    # Display chat history
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    # Example prompts section
+    st.markdown(EXAMPLE_PROMPTS_HEADING_HTML, unsafe_allow_html=True)
+
+    # Create columns for the grid
+    cols = st.columns(3)
+
+    # Display prompts in grid
+    for i, prompt in enumerate(EXAMPLE_PROMPTS):
+        with cols[i % 3]:
+            # The index alone is unique; str hashes are salted per process and
+            # would change the key (and lose widget state) across restarts
+            if st.button(
+                prompt,
+                key=f"prompt_{i}",
+                use_container_width=True,
+                type="secondary"
+            ):
+                handle_prompt(prompt)
+
+    # Chat input
+    user_input = st.chat_input(
+        "Ask me anything about your emails, calendar, or tasks...",
+        key="chat_input")
+
+    if user_input:
+        handle_prompt(user_input)
+
+chat_panel()
@@ -0,0 +1,165 @@
+"""
+Static HTML and CSS for the Streamlit app.
+
+Streamlit re-executes streamlit_app.py on every rerun; these blocks live in an
+imported module so they are built once per process and the page script only
+references them.
+"""
+
+# Dark theme, feature cards, status badges and prompt button styling
+APP_CSS = """
+    <style>
+    /* Main app */
+    .stApp {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+    }
+    
+    /* Sidebar */
+    .css-1d391kg {
+        background-color: #252526;
+    }
+    
+    /* Headers */
+    h1, h2, h3, h4, h5, h6 {
+        color: #E0E0E0 !important;
+    }
+    
+    /* Feature cards */
+    .feature-card {
+        background-color: #2D2D2D;
+        border-radius: 8px;
+        padding: 20px;
+        margin: 10px 0;
+        border: 1px solid #3E3E3E;
+    }
+    
+    /* Status badges */
+    .status-badge {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        padding: 8px 16px;
+        border-radius: 20px;
+        font-size: 0.9em;
+        margin: 5px;
+        border: 1px solid #3E3E3E;
+        display: inline-flex;
+        align-items: center;
+        gap: 8px;
+    }
+    
+    .status-badge.connected {
+        border-color: #4CAF50;
+    }
+    
+    /* Custom button styling */
+    .stButton > button {
+        background: rgba(0, 198, 255, 0.05) !important;
+        border: 1px solid #2D2D2D !important;
+        color: #E0E0E0 !important;
+        padding: 12px 20px !important;
+        border-radius: 8px !important;
+        cursor: pointer !important;
+        transition: all 0.3s ease !important;
+        text-align: left !important;
+        width: 100% !important;
+        margin: 5px 0 !important;
+        font-size: 1em !important;
+    }
+    
+    .stButton > button:hover {
+        background: rgba(0, 198, 255, 0.1) !important;
+        border-color: #00C6FF !important;
+        box-shadow: 0 4px 12px rgba(0, 198, 255, 0.1) !important;
+    }
+
+    /* Grid spacing */
+    div[data-testid="stHorizontalBlock"] {
+        gap: 1rem;
+    }
+    </style>
+"""
+
+# Logo and branding at the top of the sidebar
+SIDEBAR_BRAND_HTML = """
+        <div style='display: flex; align-items: center; margin-bottom: 25px; padding: 15px 10px;'>
+            <div style='background: linear-gradient(135deg, #00C6FF 0%, #0072FF 100%); width: 40px; height: 40px; border-radius: 12px; display: flex; align-items: center; justify-content: center; margin-right: 15px; box-shadow: 0 4px 12px rgba(0, 198, 255, 0.2);'>
+                <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                    <path d="M12 3L20 7.5V16.5L12 21L4 16.5V7.5L12 3Z" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                    <path d="M12 8L16 10.5V15.5L12 18L8 15.5V10.5L12 8Z" fill="white"/>
+                </svg>
+            </div>
+            <div>
+                <div style='font-size: 1.4em; font-weight: 600; color: #E0E0E0; margin-bottom: 2px;'>TaskMind AI</div>
+                <div style='font-size: 0.8em; color: #888888;'>Intelligent Productivity</div>
+            </div>
+        </div>
+    """
+
+SIDEBAR_QUICK_ACTIONS_HTML = "<p style='color: #888888; font-size: 1.2em; margin: 20px 0;'>Quick Actions</p>"
+
+# Email, Calendar and Task feature summaries, sent as one block
+SIDEBAR_SECTIONS_HTML = """
+        <div style='margin: 20px 0;'>
+            <div style='display: flex; align-items: center; margin-bottom: 10px;'>
+                <span style='font-size: 1.2em; margin-right: 8px;'>📧</span>
+                <span style='font-size: 1.2em; color: #E0E0E0;'>Email Management</span>
+            </div>
+            <div style='margin-left: 28px; color: #888888;'>
+                • Search and filter emails<br>
+                • Analyze email sentiment<br>
+                • Extract tasks from emails
+            </div>
+        </div>
+        <div style='height: 1px; background: #3E3E3E; margin: 20px 0;'></div>
+    
+        <div style='margin: 20px 0;'>
+            <div style='display: flex; align-items: center; margin-bottom: 10px;'>
+                <span style='font-size: 1.2em; margin-right: 8px;'>📅</span>
+                <span style='font-size: 1.2em; color: #E0E0E0;'>Calendar</span>
+            </div>
+            <div style='margin-left: 28px; color: #888888;'>
+                • View upcoming events<br>
+                • Create new events<br>
+                • Set reminders
+            </div>
+        </div>
+        <div style='height: 1px; background: #3E3E3E; margin: 20px 0;'></div>
+    
+        <div style='margin: 20px 0;'>
+            <div style='display: flex; align-items: center; margin-bottom: 10px;'>
+                <span style='font-size: 1.2em; margin-right: 8px;'>✅</span>
+                <span style='font-size: 1.2em; color: #E0E0E0;'>Task Management</span>
+            </div>
+            <div style='margin-left: 28px; color: #888888;'>
+                • Track pending tasks<br>
+                • Set priorities<br>
+                • Get task summaries
+            </div>
+        </div>
+    """
+
+MAIN_HEADER_HTML = """
+    <div style='text-align: center; padding: 20px 0 40px 0;'>
+        <h1 style='font-size: 2.5em; font-weight: 600; margin: 0; padding: 0;'>TaskMind AI</h1>
+        <div style='height: 10px;'></div>
+        <p style='font-size: 1.1em; color: #888888; margin: 0; padding: 0;'>Your intelligent AI assistant for seamless productivity</p>
+    </div>
+"""
+
+# Gmail, Calendar and AI status shown under the header
+STATUS_BADGES_HTML = """
+    <div style='display: flex; justify-content: center; gap: 20px; margin-bottom: 30px;'>
+        <div class='status-badge connected' style='background: rgba(0, 198, 255, 0.1); border-color: #00C6FF;'>
+            <span>📧</span><span>Gmail Connected</span>
+        </div>
+        <div class='status-badge connected' style='background: rgba(0, 198, 255, 0.1); border-color: #00C6FF;'>
+            <span>📅</span><span>Calendar Connected</span>
+        </div>
+        <div class='status-badge connected' style='background: rgba(0, 198, 255, 0.1); border-color: #00C6FF;'>
+            <span>🤖</span><span>AI Ready</span>
+        </div>
+    </div>
+"""
+
+EXAMPLE_PROMPTS_HEADING_HTML = "<div style='color: #888888; margin: 30px 0 20px 0; font-size: 1.2em;'>Try asking me:</div>"
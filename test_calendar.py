@@ -1,37 +1,49 @@
 import os
-from datetime import datetime
-from utils.google_calendar_client import GoogleCalendarClient
-
-# Define test details for event creation
-event_details = {
-    "summary": "Test Meeting",
-    "description": "Discuss project milestones and next steps.",
-    "start_time": datetime(2025, 4, 1, 15, 0),  # Set to a valid datetime
-    "end_time": datetime(2025, 4, 1, 16, 0),    # Set to a valid datetime
-    "attendees": ["email@example.com", "anotheremail@example.com"],  # Replace with valid email addresses
-}
-
-def test_create_event():
-    try:
-        print("Testing Google Calendar Event Creation...")
-
-        # Initialize the GoogleCalendarClient
-        calendar_client = GoogleCalendarClient()
-        
-        # Call the create_event method with attendees
-        event_link = calendar_client.create_event(
-            summary=event_details["summary"],
-            description=event_details["description"],
-            start_time=event_details["start_time"],
-            end_time=event_details["end_time"],
-            attendees=event_details["attendees"]  # Pass the list of attendees as a keyword argument
-        )
-
-        # Print success message with the event link
-        print(f"Event '{event_details['summary']}' created successfully!")
-        print(f"Event details: {event_link}")
-    except Exception as e:
-        print(f"Error occurred: {e}")
-
-if __name__ == "__main__":
-    test_create_event()
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+# Creating an event writes to the real calendar, so it only runs on request
+calendar_writes = pytest.mark.skipif(
+    os.getenv("RUN_CALENDAR_WRITE_TESTS") != "1",
+    reason="set RUN_CALENDAR_WRITE_TESTS=1 to create (and delete) a real calendar event",
+)
+
+
+@pytest.fixture
+def event_details(calendar_client):
+    # A unique title, so teardown only deletes the event this test created
+    start_time = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    details = {
+        "summary": f"Test Meeting {uuid.uuid4().hex[:8]}",
+        "description": "Discuss project milestones and next steps.",
+        "start_time": start_time,
+        "end_time": start_time + timedelta(hours=1),
+    }
+    yield details
+
+    events = calendar_client.service.events()
+    found = events.list(
+        calendarId="primary",
+        q=details["summary"],
+        timeMin=details["start_time"].isoformat() + "Z",
+        timeMax=details["end_time"].isoformat() + "Z",
+        singleEvents=True,
+    ).execute()
+    for event in found.get("items", []):
+        if event.get("summary") == details["summary"]:
+            events.delete(calendarId="primary", eventId=event["id"]).execute()
+
+
+@calendar_writes
+def test_create_event(calendar_client, event_details):
+    # calendar_client is the session-wide fixture from conftest.py
+    event_link = calendar_client.create_event(**event_details)
+
+    assert event_link.startswith("Event created: https://")
+
+
+def test_get_upcoming_events(calendar_client):
+    events = calendar_client.get_upcoming_events(max_results=5)
+    assert len(events) <= 5
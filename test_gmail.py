@@ -1,13 +1,19 @@
 # test_gmail.py
+# Uses the session-wide gmail_client fixture from conftest.py
 
-from utils.gmail_client import GmailClient
 
-client = GmailClient()
-emails = client.get_recent_emails()
+def test_get_recent_emails(gmail_client):
+    emails = gmail_client.get_recent_emails(max_results=5)
+
+    assert len(emails) <= 5
+    for email in emails:
+        assert set(email) == {"from", "subject", "snippet"}
+
+
+def test_search_emails(gmail_client):
+    emails = gmail_client.search_emails("in:inbox", max_results=5)
+
+    assert len(emails) <= 5
+    for email in emails:
+        assert set(email) == {"from", "subject", "snippet"}
 
-print("\n📥 Gmail Inbox:")
-for i, email in enumerate(emails, 1):
-    print(f"\nEmail #{i}")
-    print(f"From: {email['from']}")
-    print(f"Subject: {email['subject']}")
-    print(f"Snippet: {email['snippet']}")
@@ -3,13 +3,23 @@
     the Outlook API. I will test it later.
 """
 
+import itertools
 import os
-from msal import PublicClientApplication
+from msal import PublicClientApplication, SerializableTokenCache
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
 
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+
+# Only the message properties we show; Graph returns the full body otherwise
+MESSAGE_FIELDS = "subject,from,bodyPreview"
+
+# MSAL token cache (access and refresh tokens), kept between runs
+TOKEN_CACHE_PATH = "token_outlook.json"
+
 class OutlookClient:
     def __init__(self):
         self.client_id = os.getenv("AZURE_CLIENT_ID")
@@ -18,8 +28,36 @@ class OutlookClient:
         self.authority = f"https://login.microsoftonline.com/{self.tenant_id}"
         self.token = self.authenticate()
 
+        # One session for every Graph call, so the TLS connection is reused
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        })
+
     def authenticate(self):
-        app = PublicClientApplication(client_id=self.client_id, authority=self.authority)
+        cache = SerializableTokenCache()
+        if os.path.exists(TOKEN_CACHE_PATH):
+            with open(TOKEN_CACHE_PATH) as f:
+                cache.deserialize(f.read())
+
+        app = PublicClientApplication(client_id=self.client_id, authority=self.authority, token_cache=cache)
+        try:
+            return self._acquire_token(app)
+        finally:
+            if cache.has_state_changed:
+                with open(TOKEN_CACHE_PATH, "w") as f:
+                    f.write(cache.serialize())
+
+    def _acquire_token(self, app):
+        # A cached or refreshable token avoids the device flow entirely
+        accounts = app.get_accounts()
+        if accounts:
+            result = app.acquire_token_silent(self.scopes, account=accounts[0])
+            if result and "access_token" in result:
+                return result["access_token"]
+
         flow = app.initiate_device_flow(scopes=self.scopes)
 
         if "user_code" not in flow:
@@ -34,25 +72,30 @@ class OutlookClient:
             raise Exception("❌ Authentication failed", result)
 
     def get_recent_emails(self, user_id="me", count=5):
-        url = f"https://graph.microsoft.com/v1.0/{user_id}/messages?$top={count}&$orderby=receivedDateTime desc"
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json"
+        return list(itertools.islice(self.iter_emails(user_id, page_size=count), count))
+
+    def iter_emails(self, user_id="me", page_size=25):
+        """Yields email summaries newest first, fetching one page at a time."""
+        url = f"{GRAPH_URL}/{user_id}/messages"
+        params = {
+            "$select": MESSAGE_FIELDS,
+            "$top": page_size,
+            "$orderby": "receivedDateTime desc"
         }
-        response = requests.get(url, headers=headers)
+        while url:
+            response = self.session.get(url, params=params)
+            if response.status_code != 200:
+                raise Exception("Failed to fetch emails", response.text)
 
-        if response.status_code == 200:
-            messages = response.json().get("value", [])
-            return [
-                {
+            data = response.json()
+            for m in data.get("value", []):
+                yield {
                     "subject": m.get("subject"),
                     "from": m.get("from", {}).get("emailAddress", {}).get("address"),
                     "body_preview": m.get("bodyPreview")
                 }
-                for m in messages
-            ]
-        else:
-            raise Exception("Failed to fetch emails", response.text)
+            # nextLink already carries the query parameters
+            url, params = data.get("@odata.nextLink"), None
 
 if __name__ == "__main__":
     try:
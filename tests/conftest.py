@@ -0,0 +1,12 @@
+"""
+Shared setup for the offline unit tests in this directory.
+
+These tests use fakes in place of Google, Azure OpenAI and Tavily, so they
+need no credentials or network access.
+"""
+import os
+
+# agent.tools builds an AuthManager at import, which only checks these are set
+for _var in ("AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT",
+             "AZURE_OPENAI_API_VERSION", "AZURE_OPENAI_DEPLOYMENT_NAME"):
+    os.environ.setdefault(_var, "test")
@@ -0,0 +1,200 @@
+# tests/test_agent_runner.py
+# Offline tests for run_agent's streaming, driven by a fake agent
+import asyncio
+import io
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from agent import agent_runner
+from agent.agent_runner import AgentConfig, run_agent
+
+
+class _FakeAgent:
+    """Streams a fixed list of token deltas in "messages" mode."""
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.closed = False
+
+    async def astream(self, inputs, config, stream_mode, **kwargs):
+        try:
+            for token in self.tokens:
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                yield AIMessageChunk(content=token), {"langgraph_node": "agent"}
+        finally:
+            self.closed = True
+
+
+def _config(**overrides):
+    config = AgentConfig()
+    config.echo = False
+    # Flush on batch size only, so the tests do not depend on timing
+    config.flush_interval = float("inf")
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    return config
+
+
+async def _collect(query, config):
+    return [text async for text in run_agent(query, config)]
+
+
+def test_first_token_flushes_immediately_and_batches_grow(monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: _FakeAgent(["t"] * 40))
+
+    batches = asyncio.run(_collect("hi", _config()))
+
+    # min_batch 1, growing 3x per flush up to max_batch 25, then the remainder
+    assert [len(batch) for batch in batches] == [1, 3, 9, 25, 2]
+    assert "".join(batches) == "t" * 40
+
+
+def test_total_timeout_cuts_off_a_stalled_step_and_closes_the_stream(monkeypatch):
+    agent = _FakeAgent(["a", "b"], delay=3)
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: agent)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(_collect("hi", _config(total_timeout=0.2)))
+
+    assert time.monotonic() - started < 1
+    assert agent.closed
+
+
+def test_non_text_chunk_flushes_pending_text(monkeypatch):
+    class _ToolHandover(_FakeAgent):
+        async def astream(self, inputs, config, stream_mode, **kwargs):
+            for token in ("a", "b", "c"):
+                yield AIMessageChunk(content=token), {"langgraph_node": "agent"}
+            yield object(), {"langgraph_node": "tools"}
+            yield AIMessageChunk(content="d"), {"langgraph_node": "agent"}
+
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: _ToolHandover([]))
+
+    batches = asyncio.run(_collect("hi", _config(min_batch=10)))
+
+    assert batches == ["abc", "d"]
+
+
+class _CountingStdout(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+def test_stream_printer_writes_only_unseen_text_and_throttles_flushes(monkeypatch):
+    stdout = _CountingStdout()
+    monkeypatch.setattr(agent_runner.sys, "stdout", stdout)
+    printer = agent_runner._StreamPrinter(flush_interval=60)
+
+    printer.push(AIMessage(content="Hel", id="m1"))
+    printer.push(AIMessage(content="Hello", id="m1"))
+    printer.push(ToolMessage(content="tool output", tool_call_id="t1"))
+    printer.push(AIMessage(content="Bye", id="m2"))
+    printer.close()
+
+    assert stdout.getvalue() == "Hello\n\nBye\n"
+    # The first write flushes; later ones wait for flush_interval, then close flushes
+    assert stdout.flushes == 2
+
+
+def test_profiler_charges_time_and_streamed_usage_to_each_step():
+    profiler = agent_runner._StepProfiler()
+    chunk = AIMessageChunk(content="", usage_metadata={"input_tokens": 12, "output_tokens": 5, "total_tokens": 17})
+
+    label = profiler.label(chunk, {"langgraph_node": "agent"})
+    profiler.record(label, chunk)
+    profiler.record(label, AIMessageChunk(content="more"))
+
+    assert label == "agent"
+    entry = profiler.stats["agent"]
+    assert entry["steps"] == 2
+    assert (entry["input_tokens"], entry["output_tokens"]) == (12, 5)
+    assert entry["seconds"] >= 0
+
+
+def test_streamed_model_reports_token_usage():
+    agent_runner.get_llm_model.cache_clear()
+    try:
+        assert agent_runner.get_llm_model().stream_usage is True
+    finally:
+        agent_runner.get_llm_model.cache_clear()
+
+
+def test_step_processing_error_is_raised_not_swallowed(monkeypatch):
+    class _Malformed(_FakeAgent):
+        async def astream(self, inputs, config, stream_mode, **kwargs):
+            yield AIMessageChunk(content="a"), {"langgraph_node": "agent"}
+            yield "not a (chunk, metadata) pair"
+
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: _Malformed([]))
+
+    with pytest.raises(ValueError):
+        asyncio.run(_collect("hi", _config()))
+
+
+def test_run_agent_sync_drives_every_run_on_one_loop(monkeypatch):
+    loops = []
+
+    class _LoopRecorder(_FakeAgent):
+        async def astream(self, inputs, config, stream_mode, **kwargs):
+            loops.append(asyncio.get_running_loop())
+            async for step in super().astream(inputs, config, stream_mode, **kwargs):
+                yield step
+
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: _LoopRecorder(["a", "b"]))
+
+    for _ in range(2):
+        assert "".join(agent_runner.run_agent_sync("hi", _config())) == "ab"
+    assert len(loops) == 2 and loops[0] is loops[1] and not loops[0].is_closed()
+
+
+def test_run_agent_sync_reraises_run_errors(monkeypatch):
+    with pytest.raises(ValueError):
+        list(agent_runner.run_agent_sync("   ", _config()))
+
+
+def test_stopping_run_agent_sync_early_closes_the_stream(monkeypatch):
+    agent = _FakeAgent(["a", "b", "c"], delay=0.5)
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: agent)
+
+    steps = agent_runner.run_agent_sync("hi", _config())
+    assert next(steps) == "a"
+    steps.close()
+
+    assert agent.closed
+
+
+class _ByteEncoder:
+    """Worst-case tokenizer: one token per UTF-8 byte."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return list(text.encode("utf-8"))
+
+
+def test_query_size_limits(monkeypatch):
+    encoder = _ByteEncoder()
+    monkeypatch.setattr(agent_runner, "_get_token_encoder", lambda: encoder)
+    config = _config(max_query_chars=100, max_query_tokens=20)
+
+    agent_runner.check_query_size("short question", config)
+    assert encoder.calls == 0  # fewer bytes than the token limit: not encoded
+
+    with pytest.raises(ValueError, match="characters"):
+        agent_runner.check_query_size("x" * 101, config)
+
+    # 10 characters, but 40 bytes and so up to 40 tokens
+    with pytest.raises(ValueError, match="tokens"):
+        agent_runner.check_query_size("😀" * 10, config)
+    assert encoder.calls == 1
@@ -0,0 +1,79 @@
+# tests/test_auth_manager.py
+# Offline tests for AuthManager's token refresh and service construction
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from agent import auth_manager
+from agent.auth_manager import AuthManager
+
+
+class _FakeCreds:
+    def __init__(self, expires_in):
+        self.refresh_token = "refresh"
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + expires_in
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.expiry += timedelta(hours=1)
+
+    def to_json(self):
+        return json.dumps({"refresh_token": self.refresh_token, "expiry": self.expiry.isoformat()})
+
+
+def _wait_for_refreshes(manager):
+    deadline = time.monotonic() + 5
+    while manager._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_token_near_expiry_is_refreshed_once_in_the_background(tmp_path):
+    manager = AuthManager()
+    creds = _FakeCreds(expires_in=timedelta(minutes=2))
+    token_path = str(tmp_path / "token.json")
+
+    for _ in range(5):
+        manager._refresh_ahead(creds, token_path)
+    _wait_for_refreshes(manager)
+
+    assert creds.refreshes == 1
+    assert manager._token_cache[token_path] is creds
+    with open(token_path) as token:
+        assert json.load(token)["refresh_token"] == "refresh"
+    # The write goes through a temporary file that is renamed into place
+    assert [path.name for path in tmp_path.iterdir()] == ["token.json"]
+
+
+def test_token_far_from_expiry_is_left_alone(tmp_path):
+    manager = AuthManager()
+    creds = _FakeCreds(expires_in=timedelta(hours=1))
+
+    manager._refresh_ahead(creds, str(tmp_path / "token.json"))
+
+    assert not manager._refreshing
+    assert creds.refreshes == 0
+
+
+def test_concurrent_callers_build_the_gmail_service_once(monkeypatch):
+    builds = []
+
+    def slow_build(name, version, creds, before_request=None):
+        time.sleep(0.05)
+        builds.append(name)
+        return object()
+
+    monkeypatch.setattr(auth_manager, "_build_google_service", slow_build)
+    manager = AuthManager()
+    manager.gmail_creds = _FakeCreds(expires_in=timedelta(hours=1))
+    services = []
+    threads = [threading.Thread(target=lambda: services.append(manager.get_gmail_service())) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builds == ["gmail"]
+    assert len(services) == 8 and len({id(service) for service in services}) == 1
@@ -0,0 +1,83 @@
+# tests/test_calendar_client.py
+# Offline tests for GoogleCalendarClient's batch inserts, driven by a fake service
+from datetime import datetime, timedelta
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from utils import google_calendar_client
+from utils.google_calendar_client import GoogleCalendarClient
+
+
+class _Resp(dict):
+    def __init__(self, status):
+        super().__init__(status=str(status))
+        self.status = status
+        self.reason = "error"
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.executed.append(len(self.requests))
+        if len(self.service.executed) in self.service.failing_batches:
+            raise HttpError(_Resp(500), b"backend error")
+        for request_id, body in self.requests:
+            self.callback(request_id, {"htmlLink": f"link/{body['summary']}"}, None)
+
+
+class _FakeService:
+    def __init__(self, failing_batches=()):
+        self.failing_batches = set(failing_batches)
+        self.executed = []
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        return body
+
+
+class _FakeAuth:
+    def __init__(self, service):
+        self.service = service
+
+    def get_calendar_service(self):
+        return self.service
+
+
+def _event(i):
+    start = datetime(2026, 1, 1, 9) + timedelta(hours=i)
+    return {"summary": f"e{i}", "description": "", "start_time": start, "end_time": start + timedelta(hours=1)}
+
+
+def test_failed_batch_leaves_only_its_own_entries_empty(monkeypatch):
+    monkeypatch.setattr(google_calendar_client, "BATCH_SIZE", 2)
+    service = _FakeService(failing_batches={2})
+
+    links = GoogleCalendarClient(_FakeAuth(service)).create_events_batch([_event(i) for i in range(5)])
+
+    assert service.executed == [2, 2, 1]
+    assert links == ["link/e0", "link/e1", None, None, "link/e4"]
+
+
+def test_malformed_event_raises_before_any_insert(monkeypatch):
+    monkeypatch.setattr(google_calendar_client, "BATCH_SIZE", 2)
+    service = _FakeService()
+    events = [_event(i) for i in range(3)]
+    del events[2]["end_time"]
+
+    with pytest.raises(TypeError):
+        GoogleCalendarClient(_FakeAuth(service)).create_events_batch(events)
+
+    assert service.executed == []
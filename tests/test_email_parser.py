@@ -0,0 +1,53 @@
+# tests/test_email_parser.py
+# Offline tests for parse_email and its per-message cache
+from utils import email_parser
+from utils.email_parser import parse_email
+
+RAW_EMAIL = """From: alice@example.com
+To: bob@example.com
+Date: Mon, 5 Jan 2026 09:00:00 +0000
+Subject: Standup notes
+Content-Type: text/plain; charset="utf-8"
+
+Shipped the release.
+"""
+
+RAW_MULTIPART = """From: alice@example.com
+To: bob@example.com
+Subject: Both parts
+MIME-Version: 1.0
+Content-Type: multipart/alternative; boundary="b1"
+
+--b1
+Content-Type: text/plain; charset="utf-8"
+
+plain body
+--b1
+Content-Type: text/html; charset="utf-8"
+
+<p>html body</p>
+--b1--
+"""
+
+
+def test_parse_email_extracts_headers_and_body():
+    email = parse_email(RAW_EMAIL)
+
+    assert email["from"] == "alice@example.com"
+    assert email["subject"] == "Standup notes"
+    assert email["body"] == "Shipped the release.\n"
+
+
+def test_multipart_email_uses_the_plain_text_part():
+    assert parse_email(RAW_MULTIPART)["body"].strip() == "plain body"
+
+
+def test_repeat_parses_hit_the_cache_and_return_independent_copies():
+    email_parser._parse_email_cached.cache_clear()
+
+    first = parse_email(RAW_EMAIL)
+    first["subject"] = "edited by a caller"
+    second = parse_email(RAW_EMAIL)
+
+    assert second["subject"] == "Standup notes"
+    assert email_parser._parse_email_cached.cache_info().hits == 1
@@ -0,0 +1,182 @@
+# tests/test_gmail_client.py
+# Offline tests for GmailClient's batched fetching, driven by a fake Gmail service
+import threading
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from utils.gmail_client import MAX_CONCURRENT_BATCHES, MAX_FALLBACK_WORKERS, GmailClient, HeaderView
+
+
+class _Resp(dict):
+    def __init__(self, status):
+        super().__init__(status=str(status))
+        self.status = status
+        self.reason = "error"
+
+
+class _FakeRequest:
+    def __init__(self, message_id, service):
+        self.message_id = message_id
+        self.service = service
+
+    def execute(self, num_retries=0):
+        self.service.individual_calls.append(self.message_id)
+        self.service.threads.add(threading.current_thread().name)
+        return _message(self.message_id)
+
+
+class _FakeListRequest:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def execute(self, num_retries=0):
+        return {"messages": [{"id": message_id} for message_id in self.ids]}
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.threads.add(threading.current_thread().name)
+        if self.service.batch_status is not None:
+            raise HttpError(_Resp(self.service.batch_status), b"batch failed")
+        # Gmail may answer the calls of a batch in any order
+        for request_id, request in reversed(self.requests):
+            if request.message_id in self.service.throttled:
+                self.callback(request_id, None, HttpError(_Resp(429), b"rate limited"))
+            else:
+                self.callback(request_id, _message(request.message_id), None)
+
+
+class _FakeService:
+    def __init__(self, throttled=(), batch_status=None):
+        self.throttled = set(throttled)
+        self.batch_status = batch_status
+        self.individual_calls = []
+        self.searches = []
+        self.threads = set()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, **params):
+        return _FakeRequest(id, self)
+
+    def list(self, userId, maxResults, fields, q=None):
+        self.searches.append(q)
+        return _FakeListRequest([str(i) for i in range(maxResults)])
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+
+class _FakeAuth:
+    def __init__(self, service):
+        self.service = service
+
+    def get_gmail_service(self):
+        return self.service
+
+
+def _message(message_id):
+    return {
+        "id": message_id,
+        "snippet": f"snippet {message_id}",
+        "payload": {"headers": [{"name": "Subject", "value": f"subject {message_id}"}]},
+    }
+
+
+def test_unsupported_batch_falls_back_to_individual_fetches_in_order():
+    service = _FakeService(batch_status=413)
+    ids = [str(i) for i in range(250)]  # three batch chunks, each falling back
+
+    emails = GmailClient(_FakeAuth(service)).get_messages_batch(ids)
+
+    assert [email["snippet"] for email in emails] == [f"snippet {i}" for i in ids]
+    assert sorted(service.individual_calls) == sorted(ids)
+
+
+def test_client_errors_from_a_batch_are_raised():
+    service = _FakeService(batch_status=403)
+
+    with pytest.raises(HttpError):
+        GmailClient(_FakeAuth(service)).get_messages_batch(["0", "1"])
+
+    assert service.individual_calls == []
+
+
+def test_worker_threads_are_reused_across_calls():
+    service = _FakeService(batch_status=500)
+    client = GmailClient(_FakeAuth(service))
+    ids = [str(i) for i in range(250)]
+
+    for _ in range(3):
+        client.get_messages_batch(ids)
+
+    # The shared pools' threads, and so their thread-local connections, serve every call
+    assert all(name.startswith(("gmail-batch", "gmail-fetch")) for name in service.threads)
+    assert len(service.threads) <= MAX_CONCURRENT_BATCHES + MAX_FALLBACK_WORKERS
+
+
+def test_batch_results_are_slotted_back_into_input_order():
+    service = _FakeService()
+
+    emails = GmailClient(_FakeAuth(service)).get_messages_batch(["b", "a", "c"])
+
+    assert [email["subject"] for email in emails] == ["subject b", "subject a", "subject c"]
+    assert service.individual_calls == []
+
+
+def test_concurrent_batch_chunks_keep_input_order():
+    service = _FakeService()
+    ids = [str(i) for i in range(250)]  # three batch chunks
+
+    emails = GmailClient(_FakeAuth(service)).get_messages_batch(ids)
+
+    assert [email["snippet"] for email in emails] == [f"snippet {i}" for i in ids]
+    assert {name.split("_")[0] for name in service.threads} == {"gmail-batch"}
+
+
+def test_throttled_batch_calls_are_refetched_in_place():
+    service = _FakeService(throttled={"1", "3"})
+
+    emails = GmailClient(_FakeAuth(service)).get_messages_batch(["0", "1", "2", "3"])
+
+    assert [email["subject"] for email in emails] == [f"subject {i}" for i in "0123"]
+    assert sorted(service.individual_calls) == ["1", "3"]
+
+
+def test_header_view_is_case_insensitive_and_keeps_first_value():
+    headers = HeaderView([
+        {"name": "FROM", "value": "first@example.com"},
+        {"name": "From", "value": "second@example.com"},
+    ])
+
+    assert headers["from"] == "first@example.com"
+    assert headers.get("Subject", "(No Subject)") == "(No Subject)"
+    assert headers["subject"] == ""
+
+
+def test_repeated_searches_reuse_the_listed_ids_until_cleared():
+    service = _FakeService()
+    client = GmailClient(_FakeAuth(service))
+
+    client.search_emails("from:alice", max_results=2)
+    client.search_emails("  FROM:Alice ", max_results=2)
+    client.search_emails("from:alice", max_results=3)
+    client.clear_search_cache()
+    emails = client.search_emails("from:alice", max_results=2)
+
+    # Normalised repeats are served from the cache; a new size or a clear lists again
+    assert service.searches == ["from:alice", "from:alice", "from:alice"]
+    assert [email["subject"] for email in emails] == ["subject 0", "subject 1"]
@@ -0,0 +1,83 @@
+# tests/test_streamlit_app.py
+# Runs the Streamlit script headless against a fake agent
+import pytest
+from langchain_core.messages import AIMessageChunk
+from langgraph.checkpoint.memory import MemorySaver
+from streamlit.testing.v1 import AppTest
+
+from agent import agent_runner, tools
+
+
+class _FakeAgent:
+    def __init__(self):
+        self.checkpointer = MemorySaver()
+        self.runs = []
+        self.recorded = []
+
+    async def astream(self, inputs, config, stream_mode, **kwargs):
+        self.runs.append(config["configurable"]["thread_id"])
+        for token in ("Hello", " there"):
+            yield AIMessageChunk(content=token), {"langgraph_node": "agent"}
+
+    def update_state(self, config, values, as_node):
+        self.recorded.append(config["configurable"]["thread_id"])
+
+
+@pytest.fixture
+def app(monkeypatch):
+    agent = _FakeAgent()
+    monkeypatch.setattr(tools.auth_manager, "authenticate_all", lambda: True)
+    monkeypatch.setattr(agent_runner, "get_agent", lambda *args: agent)
+    app = AppTest.from_file("../streamlit_app.py", default_timeout=10).run()
+    assert not app.exception
+    return app, agent
+
+
+def _messages(app):
+    return [message.markdown[0].value for message in app.chat_message]
+
+
+def test_chat_input_streams_the_answer_through_run_agent(app):
+    app, agent = app
+
+    app.chat_input[0].set_value("hi").run()
+
+    assert _messages(app) == ["hi", "Hello there"]
+    assert agent.runs == [app.session_state.agent_config.thread_id]
+
+
+def test_read_only_example_answer_is_reused_and_recorded_in_the_session(app):
+    app, agent = app
+    tools.invalidate_tool_cache()  # start from a fresh generation
+
+    app.button[0].click().run()
+    app.button[0].click().run()
+
+    assert _messages(app)[-1] == "Hello there"
+    assert len(agent.runs) == 1  # second click served from the cache
+    assert agent.recorded == [app.session_state.agent_config.thread_id] * 2
+
+
+def test_timed_out_run_shows_an_error_and_keeps_the_session(app, monkeypatch):
+    app, agent = app
+
+    def timed_out(query, config):
+        yield "Partial"
+        raise TimeoutError("Agent run exceeded 120.0s")
+
+    monkeypatch.setattr(agent_runner, "run_agent_sync", timed_out)
+    app.chat_input[0].set_value("slow question").run()
+
+    assert not app.exception
+    assert "exceeded" in app.error[0].value
+    assert app.session_state.messages[-1] == {"role": "assistant", "content": "Partial"}
+
+
+def test_oversized_prompt_is_rejected_before_the_model(app):
+    app, agent = app
+    limit = app.session_state.agent_config.max_query_chars
+
+    app.chat_input[0].set_value("x" * (limit + 1)).run()
+
+    assert "too long" in app.error[0].value
+    assert agent.runs == [] and app.session_state.messages == []
@@ -0,0 +1,179 @@
+# tests/test_tools.py
+# Offline tests for the agent tools module
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent import tools
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    tools.invalidate_tool_cache()
+    yield
+    tools.invalidate_tool_cache()
+
+
+def _call_concurrently(key, fetch, callers=4):
+    """Start callers _cached_call(key, fetch) calls at once and return their futures."""
+    executor = ThreadPoolExecutor(max_workers=callers)
+    futures = [executor.submit(tools._cached_call, key, fetch) for _ in range(callers)]
+    executor.shutdown(wait=False)
+    return futures
+
+
+def test_concurrent_misses_share_one_fetch():
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return ["result"]
+
+    futures = _call_concurrently(("test", "shared"), fetch)
+    time.sleep(0.1)  # let every caller reach the cache
+    release.set()
+
+    assert [f.result(5) for f in futures] == [["result"]] * 4
+    assert len(calls) == 1
+    # ...and the result is now served from the cache
+    assert tools._cached_call(("test", "shared"), fetch) == ["result"]
+    assert len(calls) == 1
+
+
+def test_fetch_error_reaches_every_waiter_and_is_not_cached():
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise ConnectionError("down")
+
+    futures = _call_concurrently(("test", "failing"), fetch)
+    time.sleep(0.1)
+    release.set()
+
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(5)
+    assert len(calls) == 1
+    assert tools._cache_get(("test", "failing")) is tools._MISS
+
+
+def test_tool_error_names_the_exception_without_its_repr():
+    assert tools._tool_error("Error searching Gmail", ValueError("bad query")) == (
+        "Error searching Gmail: ValueError: bad query"
+    )
+
+
+class _FakeTavily:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    async def ainvoke(self, payload):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return self.results
+
+
+def test_concurrent_async_searches_share_one_request(monkeypatch):
+    client = _FakeTavily([{"title": str(i)} for i in range(5)])
+    monkeypatch.setattr(tools, "_tavily_client", client)
+
+    async def search_twice():
+        return await asyncio.gather(
+            tools.tavily_tool_async.ainvoke({"query": "Python", "max_results": 2}),
+            tools.tavily_tool_async.ainvoke({"query": "python ", "max_results": 3}),
+        )
+
+    first, second = asyncio.run(search_twice())
+    assert client.calls == 1
+    assert len(first) == 2 and len(second) == 3
+
+
+def test_search_stranded_on_a_closed_loop_is_not_reused(monkeypatch):
+    client = _FakeTavily([{"title": "result"}])
+    monkeypatch.setattr(tools, "_tavily_client", client)
+
+    # Cancel the caller mid-search; the shielded task is left pending when its loop closes
+    loop = asyncio.new_event_loop()
+    call = loop.create_task(tools.tavily_tool_async.ainvoke({"query": "stranded"}))
+    loop.run_until_complete(asyncio.sleep(0.01))
+    call.cancel()
+    loop.run_until_complete(asyncio.wait({call}))
+    loop.close()
+
+    results = asyncio.run(tools.tavily_tool_async.ainvoke({"query": "stranded"}))
+    assert results == [{"title": "result"}]
+    assert all(not inflight_loop.is_closed() for inflight_loop, _ in tools._inflight_searches)
+
+
+def test_uncacheable_result_is_returned_but_not_stored():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return "ConnectionError('down')"
+
+    for _ in range(2):
+        result = tools._cached_call(("test", "error-string"), fetch,
+                                    cacheable=lambda r: isinstance(r, list))
+        assert result == "ConnectionError('down')"
+    assert len(calls) == 2
+
+
+class _FakeSyncTavily:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def invoke(self, payload):
+        self.calls += 1
+        return self.results
+
+
+def test_search_results_are_cached_per_normalized_query(monkeypatch):
+    client = _FakeSyncTavily([{"title": str(i)} for i in range(5)])
+    monkeypatch.setattr(tools, "_tavily_client", client)
+
+    assert len(tools.tavily_tool.invoke({"query": "Python  News", "max_results": 2})) == 2
+    assert len(tools.tavily_tool.invoke({"query": "python news", "max_results": 4})) == 4
+    assert client.calls == 1
+
+
+def test_search_error_strings_are_not_cached(monkeypatch):
+    sync_client = _FakeSyncTavily("ConnectionError('down')")
+    monkeypatch.setattr(tools, "_tavily_client", sync_client)
+    for _ in range(2):
+        tools.tavily_tool.invoke({"query": "flaky"})
+    assert sync_client.calls == 2
+
+    async_client = _FakeTavily("ConnectionError('down')")
+    monkeypatch.setattr(tools, "_tavily_client", async_client)
+    for _ in range(2):
+        asyncio.run(tools.tavily_tool_async.ainvoke({"query": "flaky"}))
+    assert async_client.calls == 2
+
+
+def test_creating_an_event_invalidates_cached_reads(monkeypatch):
+    class _FakeCalendar:
+        def create_event(self, **kwargs):
+            return "Event created: https://calendar.example/event"
+
+    monkeypatch.setattr(tools, "_get_calendar_client", lambda: _FakeCalendar())
+    tools._cache_put(("upcoming_events", 10), ["stale"])
+    generation = tools.tool_cache_generation()
+
+    tools.create_google_event.invoke({
+        "summary": "Sync", "description": "", "start_time": "2030-01-01T10:00:00",
+        "end_time": "2030-01-01T11:00:00",
+    })
+
+    assert tools._cache_get(("upcoming_events", 10)) is tools._MISS
+    assert tools.tool_cache_generation() != generation
@@ -1,12 +1,23 @@
 from email import policy
 from email.parser import Parser
+from functools import lru_cache
 from typing import Dict
 
+# Parser holds no per-message state, so one instance serves every call
+_PARSER = Parser(policy=policy.default)
+
 
 def parse_email(raw_email: str) -> Dict:
     """Parses a raw email string and extracts metadata and plain text body."""
 
-    msg = Parser(policy=policy.default).parsestr(raw_email)
+    # The agent often parses the same message more than once in a conversation;
+    # hand out a copy so callers can't modify the cached result
+    return dict(_parse_email_cached(raw_email))
+
+
+@lru_cache(maxsize=128)
+def _parse_email_cached(raw_email: str) -> Dict:
+    msg = _PARSER.parsestr(raw_email)
 
     return {
         "from": msg["From"],
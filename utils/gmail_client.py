@@ -5,12 +5,65 @@
     OAuth 2.0 credentials with the correct scopes.
 """
 
-from typing import List
-from googleapiclient.discovery import build
-from agent.auth_manager import AuthManager
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from cachetools import TTLCache
+from googleapiclient.errors import HttpError
+from agent.auth_manager import AuthManager, GOOGLE_API_RETRIES
 
-# If modifying these scopes, delete the token_gmail.pickle file
-SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
+logger = logging.getLogger(__name__)
+
+# Only these headers are requested when fetching message metadata
+METADATA_HEADERS = ["From", "Subject"]
+# ...and only these parts of the message resource (partial response)
+METADATA_FIELDS = "id,snippet,payload/headers"
+
+# Statuses for which a call from a batch is retried on its own
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Gmail accepts at most 100 calls per batch request
+BATCH_SIZE = 100
+
+# Batch requests in flight at once for large id lists; kept low because each
+# call inside a batch still counts against the per-user quota
+MAX_CONCURRENT_BATCHES = 4
+
+# Batch request statuses that mean batching itself failed (e.g. a proxy
+# mangling the multipart body) rather than the calls inside it
+BATCH_UNSUPPORTED_STATUSES = (400, 413)
+
+# Individual message fetches in flight at once when batching is unavailable
+MAX_FALLBACK_WORKERS = 8
+
+# Search results (message ids only) are reused for this long; the agent often
+# repeats a search while re-planning, and new mail shows up within a minute
+SEARCH_CACHE_TTL = 60
+SEARCH_CACHE_SIZE = 256
+
+# Shared worker pools, so each worker thread's keep-alive connection (see
+# auth_manager._get_thread_http) outlives a single call. Batch chunks fall back
+# to individual fetches from inside a batch worker, so the two pools must be
+# separate: a chunk waiting on its own pool could deadlock it.
+_batch_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES, thread_name_prefix="gmail-batch")
+_fallback_executor = ThreadPoolExecutor(max_workers=MAX_FALLBACK_WORKERS, thread_name_prefix="gmail-fetch")
+
+
+class HeaderView:
+    """Case-insensitive, read-only lookup over a message's header list."""
+
+    def __init__(self, headers: List[dict]):
+        # Gmail does not normalise header name casing; keep the first occurrence
+        self._values = {}
+        for header in headers:
+            self._values.setdefault(header["name"].lower(), header["value"])
+
+    def get(self, name: str, default: str = "") -> str:
+        return self._values.get(name.lower(), default)
+
+    def __getitem__(self, name: str) -> str:
+        return self.get(name)
 
 
 class GmailClient:
@@ -18,51 +71,135 @@ class GmailClient:
         """Initializes the Gmail client with an AuthManager instance."""
         self.auth_manager = auth_manager
         self.service = self.auth_manager.get_gmail_service()
+        self._search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+        self._search_cache_lock = threading.Lock()
 
     def get_recent_emails(self, max_results: int = 15) -> List[dict]:
         """Fetches recent emails with basic metadata (subject, sender, snippet)."""
-        results = (
-            self.service.users()
-            .messages()
-            .list(userId="me", maxResults=max_results)
-            .execute()
-        )
-        messages = results.get("messages", [])
-        emails = []
-
-        for msg in messages:
-            msg_data = (
-                self.service.users()
-                .messages()
-                .get(userId="me", id=msg["id"])
-                .execute()
-            )
-            headers = msg_data["payload"]["headers"]
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-            sender = next((h["value"] for h in headers if h["name"] == "From"), "(Unknown Sender)")
-            snippet = msg_data.get("snippet", "")
-
-            emails.append({
-                "subject": subject,
-                "from": sender,
-                "snippet": snippet
-            })
-
-        return emails
-    
+        return self.get_messages_batch(self.list_ids(max_results=max_results))
+
     def search_emails(self, query: str, max_results: int = 15) -> List[dict]:
         """Searches emails matching the query and returns basic metadata."""
-        results = self.service.users().messages().list(userId='me', q=query, maxResults=max_results).execute()
-        messages = results.get('messages', [])
-
-        emails = []
-        for msg in messages:
-            msg_data = self.service.users().messages().get(userId='me', id=msg['id']).execute()
-            payload = msg_data.get('payload', {})
-            headers = payload.get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), '(Unknown Sender)')
-            snippet = msg_data.get('snippet', '')
-            emails.append({'subject': subject, 'from': sender, 'snippet': snippet})
-        
-        return emails
+        return self.get_messages_batch(self._search_ids(query, max_results))
+
+    def list_ids(self, query: Optional[str] = None, max_results: int = 15) -> List[str]:
+        """Lists the IDs of the most recent messages, optionally matching a search query."""
+        results = self._list_request(query, max_results).execute(num_retries=GOOGLE_API_RETRIES)
+        return [msg["id"] for msg in results.get("messages", [])]
+
+    def clear_search_cache(self):
+        """Forget cached search results, e.g. after the mailbox is known to have changed."""
+        with self._search_cache_lock:
+            self._search_cache.clear()
+
+    def _search_ids(self, query: str, max_results: int) -> List[str]:
+        """Lists the IDs matching a search, reusing results from the last SEARCH_CACHE_TTL seconds."""
+        # Gmail search operators are case-insensitive
+        key = (query.strip().lower(), max_results)
+        with self._search_cache_lock:
+            ids = self._search_cache.get(key)
+        if ids is None:
+            ids = self.list_ids(query, max_results=max_results)
+            with self._search_cache_lock:
+                self._search_cache[key] = ids
+        return list(ids)
+
+    def _list_request(self, query: Optional[str], max_results: int):
+        """Builds a messages.list request returning only ids and the next page token."""
+        params = {"userId": "me", "maxResults": max_results, "fields": "messages/id,nextPageToken"}
+        if query:
+            params["q"] = query
+        return self.service.users().messages().list(**params)
+
+    def get_messages_batch(self, message_ids: List[str], message_format: str = "metadata") -> List[dict]:
+        """
+        Fetches basic metadata for the given messages, in input order.
+
+        Messages are requested through Gmail batch requests of up to 100 calls
+        each, up to MAX_CONCURRENT_BATCHES at a time. If a batch request fails
+        as a whole, that chunk is fetched with individual calls instead.
+        """
+        chunks = [message_ids[start:start + BATCH_SIZE] for start in range(0, len(message_ids), BATCH_SIZE)]
+        if len(chunks) <= 1:
+            return [email for chunk in chunks for email in self._fetch_chunk(chunk, message_format)]
+
+        # Chunks are independent round trips; run a few at once. Each worker
+        # thread builds its requests over its own connection pool.
+        results = _batch_executor.map(lambda chunk: self._fetch_chunk(chunk, message_format), chunks)
+        return [email for chunk_emails in results for email in chunk_emails]
+
+    def _fetch_chunk(self, message_ids: List[str], message_format: str) -> List[dict]:
+        """Fetches one batch worth of messages, falling back to individual calls if the batch fails."""
+        try:
+            return self._execute_batch(message_ids, message_format)
+        except HttpError as e:
+            if e.resp.status < 500 and e.resp.status not in BATCH_UNSUPPORTED_STATUSES:
+                raise
+            logger.warning("Gmail batch request failed (%s); fetching %d messages individually", e.resp.status, len(message_ids))
+            return self._get_messages_individually(message_ids, message_format)
+
+    def _get_message_request(self, message_id: str, message_format: str):
+        """Builds a messages.get request, limited to the summary headers for metadata."""
+        params = {"userId": "me", "id": message_id, "format": message_format}
+        if message_format == "metadata":
+            params["metadataHeaders"] = METADATA_HEADERS
+            params["fields"] = METADATA_FIELDS
+        return self.service.users().messages().get(**params)
+
+    def _execute_batch(self, message_ids: List[str], message_format: str) -> List[dict]:
+        """Fetches up to BATCH_SIZE messages in a single batch request."""
+        # Responses may arrive in any order; slot them back by request id
+        emails: List[Optional[dict]] = [None] * len(message_ids)
+        # Calls inside a batch are not retried by the client library
+        throttled: List[int] = []
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                if isinstance(exception, HttpError) and exception.resp.status in RETRYABLE_STATUSES:
+                    throttled.append(int(request_id))
+                else:
+                    logger.warning("Failed to fetch message %s: %s", message_ids[int(request_id)], exception)
+                return
+            emails[int(request_id)] = self._to_summary(response)
+
+        batch = self.service.new_batch_http_request(callback=collect)
+        for i, message_id in enumerate(message_ids):
+            batch.add(self._get_message_request(message_id, message_format), request_id=str(i))
+        batch.execute()
+
+        for i in throttled:
+            emails[i] = self._get_message(message_ids[i], message_format)
+
+        return [email for email in emails if email is not None]
+
+    def _get_messages_individually(self, message_ids: List[str], message_format: str) -> List[dict]:
+        """Fetches messages with one request each, a few at a time; used when batching is unavailable."""
+        if len(message_ids) <= 1:
+            emails = [self._get_message(message_id, message_format) for message_id in message_ids]
+            return [email for email in emails if email is not None]
+
+        # Requests are built inside the workers so each goes over its own thread's connection
+        emails = _fallback_executor.map(lambda message_id: self._get_message(message_id, message_format), message_ids)
+        return [email for email in emails if email is not None]
+
+    def _get_message(self, message_id: str, message_format: str) -> Optional[dict]:
+        """Fetches one message with retries; returns None if it still fails."""
+        try:
+            return self._to_summary(
+                self._get_message_request(message_id, message_format).execute(num_retries=GOOGLE_API_RETRIES)
+            )
+        except HttpError as e:
+            logger.warning("Failed to fetch message %s: %s", message_id, e)
+            return None
+
+    @staticmethod
+    def _to_summary(msg_data: dict) -> dict:
+        """Extracts subject, sender and snippet from a message resource."""
+        # One pass over the headers; with metadataHeaders set only these two come back
+        headers = HeaderView(msg_data.get("payload", {}).get("headers", []))
+
+        return {
+            "subject": headers.get("Subject", "(No Subject)"),
+            "from": headers.get("From", "(Unknown Sender)"),
+            "snippet": msg_data.get("snippet", "")
+        }
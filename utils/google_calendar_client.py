@@ -2,10 +2,21 @@
 Google Calendar Client module that provides calendar operations through a unified class interface.
 This module uses the AuthManager for authentication and calendar operations.
 """
+import logging
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from googleapiclient.discovery import build
-from agent.auth_manager import AuthManager
+from googleapiclient.errors import HttpError
+from agent.auth_manager import AuthManager, GOOGLE_API_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Event fields returned by get_upcoming_events (partial response); the rest
+# of each event resource is never read
+EVENT_LIST_FIELDS = "items(id,summary,description,start,end,htmlLink,attendees,location)"
+
+# Google recommends at most 50 calls per Calendar batch request
+BATCH_SIZE = 50
 
 class GoogleCalendarClient:
     """A client class for interacting with Google Calendar API."""
@@ -36,6 +47,61 @@ class GoogleCalendarClient:
         Returns:
             str: URL of the created event
         """
+        event = self._build_event_body(summary, description, start_time, end_time, attendees, reminders)
+
+        # Not retried: a 5xx may still have created the event, and a retry would duplicate it
+        event_result = self.service.events().insert(calendarId='primary', body=event).execute()
+        return f"Event created: {event_result.get('htmlLink')}"
+
+    def create_events_batch(self, events: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Create several calendar events with batch requests of up to 50 inserts each.
+
+        All inserts go through this client's service, so they run as the same
+        authenticated user.
+
+        Args:
+            events: Keyword arguments for create_event, one dict per event
+
+        Returns:
+            List of event URLs in input order; None where an insert or its whole batch failed
+
+        Raises:
+            TypeError: If any event is malformed; nothing is created in that case
+        """
+        # Build every body first, so a malformed event raises before any insert
+        # has run rather than after earlier batches already created events
+        bodies = [self._build_event_body(**event) for event in events]
+        links: List[Optional[str]] = [None] * len(events)
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                logger.warning("Failed to create event %r: %s", events[int(request_id)].get('summary'), exception)
+                return
+            links[int(request_id)] = response.get('htmlLink')
+
+        for start in range(0, len(events), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for i in range(start, min(start + BATCH_SIZE, len(events))):
+                batch.add(self.service.events().insert(calendarId='primary', body=bodies[i]), request_id=str(i))
+            # Not retried, for the same reason as create_event. A failed batch
+            # leaves its entries as None; earlier batches' events already exist,
+            # so raising here would hide their links.
+            try:
+                batch.execute()
+            except HttpError as e:
+                logger.warning("Event batch starting at %d failed: %s", start, e)
+
+        return links
+
+    @staticmethod
+    def _build_event_body(summary: str,
+                          description: str,
+                          start_time: datetime,
+                          end_time: datetime,
+                          attendees: Optional[List[str]] = None,
+                          reminders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build the event resource sent to events.insert."""
         event = {
             'summary': summary,
             'description': description,
@@ -60,8 +126,7 @@ class GoogleCalendarClient:
         else:
             event['reminders'] = {'useDefault': True}
 
-        event_result = self.service.events().insert(calendarId='primary', body=event).execute()
-        return f"Event created: {event_result.get('htmlLink')}"
+        return event
 
     def get_upcoming_events(self, max_results: int = 10, time_min: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
@@ -82,8 +147,9 @@ class GoogleCalendarClient:
             timeMin=time_min.isoformat() + 'Z',
             maxResults=max_results,
             singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+            orderBy='startTime',
+            fields=EVENT_LIST_FIELDS
+        ).execute(num_retries=GOOGLE_API_RETRIES)
         
         return events_result.get('items', [])
 